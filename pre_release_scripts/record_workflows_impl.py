@@ -25,28 +25,57 @@ from __future__ import annotations
 
 import asyncio
 import os
-import subprocess  # nosec - Used safely for cp and ffmpeg commands
+import shutil
 import sys
 from pathlib import Path
 
 from playwright.async_api import Page, async_playwright
 
+# Resolved once; main() fails fast before recording if it is missing
+FFMPEG_BIN = shutil.which("ffmpeg")
 SLOW_FACTOR = float(os.environ.get("RECORDING_SLOW_FACTOR", "1"))
 MIN_ACTION_PAUSE = float(os.environ.get("RECORDING_MIN_ACTION_PAUSE", "2"))
 GIF_FPS = int(os.environ.get("RECORDING_GIF_FPS", "1"))
+# bicubic is plenty for flat UI screenshots; set to "lanczos" for release-quality GIFs
+GIF_SCALER = os.environ.get("RECORDING_GIF_SCALER", "bicubic")
+# JPEG encodes much faster than PNG in Chromium; artifacts vanish after palettization
+SCREENSHOT_QUALITY = 60
+# The React app is usable once either dashboard add button is rendered
+DASHBOARD_READY_SELECTOR = (
+    '[data-testid="add-instance-button"], [data-testid="empty-state-add-button"]'
+)
 
 
 async def slow_sleep(seconds: float) -> None:
     await asyncio.sleep(seconds * SLOW_FACTOR)
 
 
+def make_capture(page: Page, screenshots: list[bytes]):
+    """Return a ``capture(repeat=0)`` coroutine that appends frames to ``screenshots``.
+
+    ``repeat=n`` re-appends the last frame ``n`` times instead of taking new
+    screenshots; mpdecimate later folds the copies into one longer GIF frame.
+    """
+
+    async def capture(repeat: int = 0) -> None:
+        if repeat and screenshots:
+            screenshots.extend([screenshots[-1]] * repeat)
+            return
+        screenshots.append(await page.screenshot(type="jpeg", quality=SCREENSHOT_QUALITY))
+        await slow_sleep(0.35)
+
+    return capture
+
+
 async def pause_between_actions(capture, seconds: float | None = None) -> None:
     duration = seconds if seconds is not None else MIN_ACTION_PAUSE
     steps = max(1, int(duration * GIF_FPS))
-    step_seconds = duration / steps
-    for _ in range(steps):
-        await asyncio.sleep(step_seconds)
-        await capture()
+    await asyncio.sleep(duration)
+    # One fresh frame shows the settled page (spinners done, chips/toasts shown);
+    # the rest of the dwell repeats it instead of re-screenshotting a static page
+    await capture()
+    if steps > 1:
+        await capture(repeat=steps - 1)
 
 
 async def capture_and_pause(capture, seconds: float | None = None) -> None:
@@ -59,21 +88,19 @@ async def fill_field(page: Page, testid: str, value: str, timeout: int = 10000)
 
     Works for both HA native components (ha-textfield with shadow DOM)
     and fallback HTML inputs. Playwright CSS selectors pierce shadow DOM.
+    One compound selector resolves "inner input or the element itself" in the
+    browser, avoiding a separate count() round-trip.
     """
-    inner = page.locator(f'[data-testid="{testid}"] input')
-    if await inner.count():
-        await inner.fill(value, timeout=timeout)
-    else:
-        await page.locator(f'[data-testid="{testid}"]').fill(value, timeout=timeout)
+    field = f'[data-testid="{testid}"]'
+    target = page.locator(f"{field} input, {field}:not(:has(input))").first
+    await target.fill(value, timeout=timeout)
 
 
 async def click_checkbox(page: Page, testid: str) -> None:
     """Click a switch/checkbox by targeting its inner input element."""
-    checkbox = page.locator(f'[data-testid="{testid}"] input[type="checkbox"]')
-    if await checkbox.count():
-        await checkbox.click()
-    else:
-        await page.click(f'[data-testid="{testid}"]')
+    field = f'[data-testid="{testid}"]'
+    checkbox = 'input[type="checkbox"]'
+    await page.locator(f"{field} {checkbox}, {field}:not(:has({checkbox}))").first.click()
 
 
 async def setup_browser():
@@ -91,7 +118,8 @@ async def setup_browser():
 async def ha_login(page: Page, ha_url: str, username: str, password: str) -> None:
     """Log into Home Assistant via the login page."""
     print(f"  Logging into Home Assistant at {ha_url}...")
-    await page.goto(ha_url, wait_until="networkidle")
+    # networkidle never settles reliably with HA's websocket; wait for the form below
+    await page.goto(ha_url, wait_until="domcontentloaded")
     await slow_sleep(2)
 
     # HA login page has username and password fields
@@ -125,15 +153,12 @@ async def navigate_to_panel(page: Page, ha_url: str, panel_path: str) -> None:
         await sidebar_link.first.click(force=True)
     else:
         # Fallback: direct navigation
-        await page.goto(f"{ha_url}/{panel_path}", wait_until="networkidle")
+        await page.goto(f"{ha_url}/{panel_path}", wait_until="domcontentloaded")
 
     await slow_sleep(3)
 
     # Wait for the panel to render (our React app inside HA shell)
-    await page.wait_for_selector(
-        '[data-testid="add-instance-button"], [data-testid="empty-state-add-button"]',
-        timeout=15000,
-    )
+    await page.wait_for_selector(DASHBOARD_READY_SELECTOR, timeout=15000)
     print("  Panel loaded")
 
 
@@ -146,64 +171,76 @@ async def wait_for_element(page: Page, selector: str, timeout: int = 10000):
         raise
 
 
-async def stop_recording_and_create_gif(page: Page, screenshots: list, gif_path: str):
-    """Convert screenshots to GIF using ffmpeg."""
+async def stop_recording_and_create_gif(page: Page, screenshots: list[bytes], gif_path: str):
+    """Convert captured JPEG frames to GIF by piping them straight into ffmpeg."""
     if not screenshots:
         print("  No screenshots to convert to GIF")
         return
+    if not FFMPEG_BIN:
+        print("  ffmpeg not found on PATH")
+        return False
 
     print(f"  Converting {len(screenshots)} frames to GIF: {gif_path}")
 
-    # Create temporary directory for frames
-    frames_dir = Path(gif_path).parent / ".frames_tmp"
-    frames_dir.mkdir(exist_ok=True, parents=True)
-
-    try:
-        # Copy screenshots with sequence numbers
-        for i, screenshot_path in enumerate(screenshots):
-            frame_num = str(i).zfill(4)
-            dest = frames_dir / f"frame_{frame_num}.png"
-            subprocess.run(
-                ["cp", screenshot_path, str(dest)], check=True
-            )  # nosec - Safe: cp with user-controlled paths
-
-        # Convert PNG sequence to GIF with ffmpeg (slower + smaller)
-        ffmpeg_cmd = [
-            "ffmpeg",
-            "-framerate",
-            str(GIF_FPS),
-            "-i",
-            str(frames_dir / "frame_%04d.png"),
-            "-vf",
-            f"fps={GIF_FPS},scale=1024:-1:flags=lanczos,split[s0][s1];"
-            "[s0]palettegen=max_colors=128[p];"
-            "[s1][p]paletteuse=dither=bayer:bayer_scale=5",
-            "-y",  # Overwrite output
-            str(gif_path),
-        ]
-
-        result = subprocess.run(
-            ffmpeg_cmd, capture_output=True, text=True, check=False
-        )  # nosec - Safe: ffmpeg with controlled args
-
-        if result.returncode != 0:
-            print(f"  ffmpeg failed: {result.stderr}")
-            return False
-
-        # Get file size
-        size_mb = Path(gif_path).stat().st_size / (1024 * 1024)
-        print(f"  GIF created: {size_mb:.1f} MB")
-        return True
-
-    finally:
-        # Cleanup frames directory
-        import shutil
-
-        if frames_dir.exists():
-            shutil.rmtree(frames_dir, ignore_errors=True)
-
-
-async def workflow_1_add_first_proxy(page: Page, screenshots_dir: Path) -> list:
+    # Frames stay in memory and are streamed via image2pipe (no temp files)
+    ffmpeg_cmd = [
+        FFMPEG_BIN,
+        "-f",
+        "image2pipe",
+        "-framerate",
+        str(GIF_FPS),
+        "-c:v",
+        "mjpeg",
+        "-i",
+        "-",
+        "-vf",
+        # mpdecimate drops repeated frames (dwell pauses); with -vsync vfr the GIF
+        # keeps the remaining frame on screen for the dropped frames' duration
+        f"mpdecimate,scale=1024:-1:flags={GIF_SCALER},split[s0][s1];"
+        "[s0]palettegen=max_colors=128[p];"
+        "[s1][p]paletteuse=dither=bayer:bayer_scale=5",
+        "-vsync",
+        "vfr",
+        "-y",  # Overwrite output
+        str(gif_path),
+    ]
+
+    proc = await asyncio.create_subprocess_exec(
+        *ffmpeg_cmd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )  # nosec - Safe: ffmpeg with controlled args
+    _, stderr = await proc.communicate(b"".join(screenshots))
+
+    if proc.returncode != 0:
+        print(f"  ffmpeg failed: {stderr.decode(errors='replace')}")
+        return False
+
+    # Get file size
+    size_mb = Path(gif_path).stat().st_size / (1024 * 1024)
+    print(f"  GIF created: {size_mb:.1f} MB")
+    return True
+
+
+async def wait_for_gifs(gif_tasks: list[tuple[str, asyncio.Task]]) -> bool:
+    """Wait for background GIF encodes and report the ones that failed.
+
+    Returns True only if every started encode produced its GIF.
+    """
+    results = await asyncio.gather(*(task for _, task in gif_tasks), return_exceptions=True)
+    ok = True
+    for (gif_name, _), result in zip(gif_tasks, results, strict=True):
+        if isinstance(result, BaseException):
+            print(f"  GIF encoding failed for {gif_name}: {result}")
+            ok = False
+        elif not result:
+            print(f"  GIF not created: {gif_name}")
+            ok = False
+    return ok
+
+
+async def workflow_1_add_first_proxy(page: Page) -> list[bytes]:
     """
     Workflow 1: Add first proxy to empty dashboard + add users + test connectivity
 
@@ -219,16 +256,8 @@ async def workflow_1_add_first_proxy(page: Page, screenshots_dir: Path) -> list:
     """
     print("Recording Workflow 1: Add First Proxy with Auth...")
 
-    screenshots = []
-    screenshot_num = 0
-
-    async def capture():
-        nonlocal screenshot_num
-        path = screenshots_dir / f"workflow1_{str(screenshot_num).zfill(3)}.png"
-        await page.screenshot(path=str(path))
-        screenshots.append(str(path))
-        screenshot_num += 1
-        await slow_sleep(0.35)
+    screenshots: list[bytes] = []
+    capture = make_capture(page, screenshots)
 
     # Capture the empty dashboard
     print("  -> Empty dashboard...")
@@ -238,21 +267,17 @@ async def workflow_1_add_first_proxy(page: Page, screenshots_dir: Path) -> list:
     # Click "Add Instance" button (empty state)
     print("  -> Click 'Add Instance' button...")
     await page.click('[data-testid="empty-state-add-button"]')
-    await slow_sleep(1.2)
-    await capture_and_pause(capture)
-
     # Wait for create page to load
     await wait_for_element(page, '[data-testid="create-instance-form"]')
+    await capture_and_pause(capture)
 
     # Fill instance name
     print("  -> Fill basic fields...")
-    await page.locator('[data-testid="create-name-input"]').wait_for(state="visible", timeout=10000)
     await fill_field(page, "create-name-input", "proxy1")
     await slow_sleep(0.6)
     await capture_and_pause(capture)
 
     # Fill port
-    await page.locator('[data-testid="create-port-input"]').wait_for(state="visible", timeout=5000)
     await fill_field(page, "create-port-input", "3128")
     await slow_sleep(0.6)
     await capture_and_pause(capture)
@@ -260,25 +285,20 @@ async def workflow_1_add_first_proxy(page: Page, screenshots_dir: Path) -> list:
     # Click Create Instance button
     print("  -> Click Create Instance...")
     await page.click('[data-testid="create-submit-button"]')
-    await slow_sleep(2.6)
-    await capture_and_pause(capture)
 
     # Should redirect to dashboard - verify instance exists
     print("  -> Verify instance created...")
     await page.locator('[data-testid="instance-card-proxy1"]').wait_for(
         state="visible", timeout=8000
     )
-    await slow_sleep(1.2)
     await capture_and_pause(capture)
 
     # Navigate to settings
     print("  -> Open Settings...")
     await page.click('[data-testid="instance-settings-chip-proxy1"]')
-    await slow_sleep(1.2)
-    await capture_and_pause(capture)
-
     # Wait for settings page to load
     await wait_for_element(page, '[data-testid="settings-tabs"]')
+    await capture_and_pause(capture)
 
     # Scroll to Users section
     print("  -> Scroll to Users section...")
@@ -293,7 +313,7 @@ async def workflow_1_add_first_proxy(page: Page, screenshots_dir: Path) -> list:
     await fill_field(page, "user-password-input", "password123")
     await slow_sleep(0.5)
     await page.click('[data-testid="user-add-button"]')
-    await slow_sleep(0.8)
+    await wait_for_element(page, '[data-testid="user-chip-alice"]')
     await capture_and_pause(capture)
 
     # Add second user - bob
@@ -303,7 +323,7 @@ async def workflow_1_add_first_proxy(page: Page, screenshots_dir: Path) -> list:
     await fill_field(page, "user-password-input", "password456")
     await slow_sleep(0.5)
     await page.click('[data-testid="user-add-button"]')
-    await slow_sleep(0.8)
+    await wait_for_element(page, '[data-testid="user-chip-bob"]')
     await capture_and_pause(capture)
 
     # Scroll to Test Connectivity section
@@ -321,20 +341,20 @@ async def workflow_1_add_first_proxy(page: Page, screenshots_dir: Path) -> list:
     await fill_field(page, "test-url-input", "http://example.com")
     await slow_sleep(0.5)
     await page.click('[data-testid="test-button"]')
-    await slow_sleep(4)  # Wait for test to complete
+    await wait_for_element(page, '[data-testid="test-result"]', timeout=30000)
     await capture_and_pause(capture)
 
     # Return to dashboard
     print("  -> Return to dashboard...")
     await page.go_back()
-    await slow_sleep(1.2)
+    await wait_for_element(page, '[data-testid="instance-card-proxy1"]')
     await capture_and_pause(capture)
 
     print(f"  Workflow 1 recorded: {len(screenshots)} frames")
     return screenshots
 
 
-async def workflow_2_add_https_proxy(page: Page, screenshots_dir: Path) -> list:
+async def workflow_2_add_https_proxy(page: Page) -> list[bytes]:
     """
     Workflow 2: Add HTTPS proxy + add users + test connectivity
 
@@ -349,16 +369,8 @@ async def workflow_2_add_https_proxy(page: Page, screenshots_dir: Path) -> list:
     """
     print("Recording Workflow 2: Add HTTPS Proxy with Cert...")
 
-    screenshots = []
-    screenshot_num = 0
-
-    async def capture():
-        nonlocal screenshot_num
-        path = screenshots_dir / f"workflow2_{str(screenshot_num).zfill(3)}.png"
-        await page.screenshot(path=str(path))
-        screenshots.append(str(path))
-        screenshot_num += 1
-        await slow_sleep(0.35)
+    screenshots: list[bytes] = []
+    capture = make_capture(page, screenshots)
 
     # Click "Add Instance" button (FAB if instances exist, empty state otherwise)
     print("  -> Click 'Add Instance' button...")
@@ -367,11 +379,9 @@ async def workflow_2_add_https_proxy(page: Page, screenshots_dir: Path) -> list:
         await page.click('[data-testid="add-instance-button"]', timeout=2000)
     except Exception:
         await page.click('[data-testid="empty-state-add-button"]')
-    await slow_sleep(0.5)
-    await capture_and_pause(capture)
-
     # Wait for create page
     await wait_for_element(page, '[data-testid="create-instance-form"]')
+    await capture_and_pause(capture)
 
     # Fill instance name
     print("  -> Fill basic fields...")
@@ -393,32 +403,29 @@ async def workflow_2_add_https_proxy(page: Page, screenshots_dir: Path) -> list:
     # Click Create Instance button
     print("  -> Click Create Instance...")
     await page.click('[data-testid="create-submit-button"]')
-    await slow_sleep(2.6)
-    await capture_and_pause(capture)
 
     # Verify instance on dashboard
     print("  -> Verify instance created...")
     await page.locator('[data-testid="instance-card-proxy-https"]').wait_for(
         state="visible", timeout=8000
     )
-    await slow_sleep(1.2)
     await capture_and_pause(capture)
 
     # Navigate to settings
     print("  -> Open Settings...")
     await page.click('[data-testid="instance-settings-chip-proxy-https"]')
-    await slow_sleep(1.2)
-    await capture_and_pause(capture)
-
     # Wait for settings page
     await wait_for_element(page, '[data-testid="settings-tabs"]')
+    await capture_and_pause(capture)
 
     # Regenerate certificate
     print("  -> Regenerate certificate...")
     await page.locator('[data-testid="cert-regenerate-button"]').scroll_into_view_if_needed()
     await slow_sleep(0.5)
-    await page.click('[data-testid="cert-regenerate-button"]')
-    await slow_sleep(4)
+    async with page.expect_response(
+        lambda r: r.url.endswith("/certs") and r.request.method == "POST", timeout=30000
+    ):
+        await page.click('[data-testid="cert-regenerate-button"]')
     await capture_and_pause(capture)
 
     # Add user
@@ -430,7 +437,7 @@ async def workflow_2_add_https_proxy(page: Page, screenshots_dir: Path) -> list:
     await fill_field(page, "user-password-input", "secret123")
     await slow_sleep(0.5)
     await page.click('[data-testid="user-add-button"]')
-    await slow_sleep(0.8)
+    await wait_for_element(page, '[data-testid="user-chip-charlie"]')
     await capture_and_pause(capture)
 
     # Test connectivity
@@ -444,14 +451,14 @@ async def workflow_2_add_https_proxy(page: Page, screenshots_dir: Path) -> list:
     await fill_field(page, "test-url-input", "https://example.com")
     await slow_sleep(0.5)
     await page.click('[data-testid="test-button"]')
-    await slow_sleep(4)
+    await wait_for_element(page, '[data-testid="test-result"]', timeout=30000)
     await capture_and_pause(capture)
 
     print(f"  Workflow 2 recorded: {len(screenshots)} frames")
     return screenshots
 
 
-async def workflow_3_tls_tunnel(page: Page, screenshots_dir: Path) -> list:
+async def workflow_3_tls_tunnel(page: Page) -> list[bytes]:
     """
     Workflow 3: Create TLS Tunnel instance + show dashboard + settings tabs
 
@@ -467,21 +474,12 @@ async def workflow_3_tls_tunnel(page: Page, screenshots_dir: Path) -> list:
     """
     print("Recording Workflow 3: TLS Tunnel...")
 
-    screenshots = []
-    screenshot_num = 0
-
-    async def capture():
-        nonlocal screenshot_num
-        path = screenshots_dir / f"workflow3_{str(screenshot_num).zfill(3)}.png"
-        await page.screenshot(path=str(path))
-        screenshots.append(str(path))
-        screenshot_num += 1
-        await slow_sleep(0.35)
+    screenshots: list[bytes] = []
+    capture = make_capture(page, screenshots)
 
     # Navigate back to dashboard first (previous workflow may leave us on settings)
     print("  -> Navigate to dashboard...")
     await page.go_back()
-    await slow_sleep(1.5)
     # Wait for either FAB or empty state button
     await page.wait_for_selector(
         '[data-testid="add-instance-button"], [data-testid="empty-state-add-button"]',
@@ -496,16 +494,14 @@ async def workflow_3_tls_tunnel(page: Page, screenshots_dir: Path) -> list:
         await page.click('[data-testid="add-instance-button"]', timeout=2000)
     except Exception:
         await page.click('[data-testid="empty-state-add-button"]')
-    await slow_sleep(0.5)
-    await capture_and_pause(capture)
-
     # Wait for create page
     await wait_for_element(page, '[data-testid="proxy-type-tls-tunnel"]')
+    await capture_and_pause(capture)
 
     # Select TLS Tunnel proxy type
     print("  -> Select TLS Tunnel type...")
     await page.click('[data-testid="proxy-type-tls-tunnel"]')
-    await slow_sleep(0.8)
+    await wait_for_element(page, '[data-testid="create-forward-address-input"]')
     await capture_and_pause(capture)
 
     # Fill instance name
@@ -531,25 +527,20 @@ async def workflow_3_tls_tunnel(page: Page, screenshots_dir: Path) -> list:
     # Click Create Instance button
     print("  -> Click Create Instance...")
     await page.click('[data-testid="create-submit-button"]')
-    await slow_sleep(2.6)
-    await capture_and_pause(capture)
 
     # Verify instance on dashboard with TLS Tunnel badge
     print("  -> Verify TLS Tunnel instance on dashboard...")
     await page.locator('[data-testid="instance-card-vpn-tunnel"]').wait_for(
         state="visible", timeout=8000
     )
-    await slow_sleep(1.2)
     await capture_and_pause(capture)
 
     # Navigate to settings
     print("  -> Open Settings...")
     await page.click('[data-testid="instance-settings-chip-vpn-tunnel"]')
-    await slow_sleep(1.2)
-    await capture_and_pause(capture)
-
     # Wait for settings page
     await wait_for_element(page, '[data-testid="settings-tabs"]')
+    await capture_and_pause(capture)
 
     # Scroll to Connection Info card
     print("  -> Show Connection Info tab...")
@@ -580,7 +571,6 @@ async def main():
     ha_panel_path = os.environ.get("HA_PANEL_PATH", "squid-proxy-manager")
     repo_root = Path(os.environ.get("REPO_ROOT", str(Path(__file__).resolve().parent.parent)))
     gifs_dir = repo_root / "docs" / "gifs"
-    frames_dir = repo_root / "pre_release_scripts" / ".frames"
 
     use_ha = bool(ha_url)
 
@@ -594,11 +584,16 @@ async def main():
     print(f"Output directory: {gifs_dir}")
     print()
 
+    if not FFMPEG_BIN:
+        print("ffmpeg not found on PATH; it is required to build the GIFs")
+        sys.exit(1)
+
     # Ensure output directory exists
     gifs_dir.mkdir(exist_ok=True, parents=True)
-    frames_dir.mkdir(exist_ok=True, parents=True)
 
     playwright, browser, context, page = None, None, None, None
+    gif_tasks: list[tuple[str, asyncio.Task]] = []
+    failed = False
 
     try:
         print("Starting browser (Playwright/Chromium)...")
@@ -611,47 +606,28 @@ async def main():
             await navigate_to_panel(page, ha_url, ha_panel_path)
         else:
             # Navigate to standalone addon
-            await page.goto(addon_url, wait_until="networkidle")
+            await page.goto(addon_url, wait_until="domcontentloaded")
+            await page.wait_for_selector(DASHBOARD_READY_SELECTOR, timeout=15000)
             await slow_sleep(1.2)
 
-        # Workflow 1: Add first proxy with auth
-        screenshots1 = await workflow_1_add_first_proxy(page, frames_dir)
-        await stop_recording_and_create_gif(
-            page,
-            screenshots1,
-            str(gifs_dir / "00-add-first-proxy.gif"),
-        )
-
-        print()
-
-        # Workflow 2: Add HTTPS proxy
-        screenshots2 = await workflow_2_add_https_proxy(page, frames_dir)
-        await stop_recording_and_create_gif(
-            page,
-            screenshots2,
-            str(gifs_dir / "01-add-https-proxy.gif"),
-        )
-
-        print()
-
-        # Workflow 3: TLS Tunnel
-        screenshots3 = await workflow_3_tls_tunnel(page, frames_dir)
-        await stop_recording_and_create_gif(
-            page,
-            screenshots3,
-            str(gifs_dir / "02-tls-tunnel.gif"),
-        )
-
-        print()
-        print("All workflows recorded successfully!")
-        print(f"GIFs saved to: {gifs_dir}/")
+        # Each GIF is encoded in the background while the next workflow records
+        workflows = [
+            (workflow_1_add_first_proxy, "00-add-first-proxy.gif"),
+            (workflow_2_add_https_proxy, "01-add-https-proxy.gif"),
+            (workflow_3_tls_tunnel, "02-tls-tunnel.gif"),
+        ]
+        for workflow, gif_name in workflows:
+            screenshots = await workflow(page)
+            encode = stop_recording_and_create_gif(page, screenshots, str(gifs_dir / gif_name))
+            gif_tasks.append((gif_name, asyncio.create_task(encode)))
+            print()
 
     except Exception as e:
         print(f"Error during recording: {e}")
         import traceback
 
         traceback.print_exc()
-        sys.exit(1)
+        failed = True
 
     finally:
         if page and context:
@@ -660,12 +636,16 @@ async def main():
             await browser.close()
         if playwright:
             await playwright.stop()
+        # Always drain started encodes so GIFs of completed workflows are not truncated
+        if not await wait_for_gifs(gif_tasks):
+            failed = True
 
-        # Cleanup frames directory
-        if frames_dir.exists():
-            import shutil
+    if failed:
+        sys.exit(1)
 
-            shutil.rmtree(frames_dir, ignore_errors=True)
+    print()
+    print("All workflows recorded successfully!")
+    print(f"GIFs saved to: {gifs_dir}/")
 
 
 if __name__ == "__main__":
@@ -1,13 +1,92 @@
 """Basic auth user management (htpasswd generation)."""
 
+import fcntl
+import hashlib
 import logging
+import os
 import re
+import secrets
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 _LOGGER = logging.getLogger(__name__)
 
 PERM_PASSWORD_FILE = 0o640
 USERNAME_RE = re.compile(r"^[a-zA-Z0-9_@.-]{1,64}$")
+APR1_MAGIC = b"$apr1$"
+APR1_ROUNDS = 1000
+_CRYPT_ALPHABET = "./0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+
+def _crypt_b64(value: int, length: int) -> str:
+    """Encode an integer using the crypt(3) base64 alphabet."""
+    chars = []
+    for _ in range(length):
+        chars.append(_CRYPT_ALPHABET[value & 0x3F])
+        value >>= 6
+    return "".join(chars)
+
+
+def apr1_hash(password: str, salt: str | None = None) -> str:
+    """Compute an Apache MD5-crypt (apr1) hash in-process.
+
+    Produces the same output as ``openssl passwd -apr1`` and is understood by
+    Squid's basic_ncsa_auth helper, without forking a process per password.
+
+    Args:
+        password: Plain text password
+        salt: Optional salt (up to 8 chars); a random one is generated if omitted
+
+    Returns:
+        Hash string in ``$apr1$<salt>$<digest>`` form
+    """
+    if salt is None:
+        salt = "".join(secrets.choice(_CRYPT_ALPHABET) for _ in range(8))
+    salt = salt[:8]
+    pw = password.encode("utf-8")
+    salt_bytes = salt.encode("ascii")
+
+    alternate = hashlib.md5(pw + salt_bytes + pw, usedforsecurity=False).digest()
+    ctx = hashlib.md5(pw + APR1_MAGIC + salt_bytes, usedforsecurity=False)
+    for remaining in range(len(pw), 0, -16):
+        ctx.update(alternate[: min(16, remaining)])
+    i = len(pw)
+    while i:
+        ctx.update(b"\x00" if i & 1 else pw[:1])
+        i >>= 1
+    digest = ctx.digest()
+
+    for i in range(APR1_ROUNDS):
+        round_ctx = hashlib.md5(pw if i & 1 else digest, usedforsecurity=False)
+        if i % 3:
+            round_ctx.update(salt_bytes)
+        if i % 7:
+            round_ctx.update(pw)
+        round_ctx.update(digest if i & 1 else pw)
+        digest = round_ctx.digest()
+
+    encoded = "".join(
+        _crypt_b64((digest[a] << 16) | (digest[b] << 8) | digest[c], 4)
+        for a, b, c in ((0, 6, 12), (1, 7, 13), (2, 8, 14), (3, 9, 15), (4, 10, 5))
+    )
+    encoded += _crypt_b64(digest[11], 2)
+    return f"$apr1${salt}${encoded}"
+
+
+def validate_credentials(username: str, password: str) -> None:
+    """Validate a username/password pair.
+
+    Raises:
+        ValueError: If username or password is invalid
+    """
+    # JSON input may carry non-string values; reject them as invalid, not as a TypeError
+    if not isinstance(username, str) or not isinstance(password, str):
+        raise ValueError("Username and password must be strings")
+    if not USERNAME_RE.match(username):
+        raise ValueError("Username must be 1-64 chars and contain only a-z, 0-9, _ @ . -")
+    if not password or len(password) < 8:
+        raise ValueError("Password must be at least 8 characters")
 
 
 class AuthManager:
@@ -20,41 +99,88 @@ class AuthManager:
             passwd_file: Path to htpasswd file
         """
         self.passwd_file = passwd_file
-        self._users: dict[str, str] = {}  # username -> bcrypt hash
+        # ((mtime_ns, size) of passwd_file, username -> apr1 hash) as of the last
+        # sync with the file. Replaced as one tuple and never mutated in place, so
+        # lock-free readers in worker threads always see a matching pair.
+        self._cache: tuple[tuple[int, int] | None, dict[str, str]] = (None, {})
 
-    def _load_users(self) -> None:
-        """Load users from htpasswd file."""
-        self._users = {}
-        if not self.passwd_file.exists():
-            return
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """Hold an exclusive flock on a sidecar lock file while mutating passwd.
 
+        Readers need no lock: full rewrites are atomic renames and single
+        additions are O_APPEND writes.
+        """
+        lock_file = self.passwd_file.with_name(self.passwd_file.name + ".lock")
+        fd = os.open(lock_file, os.O_WRONLY | os.O_CREAT, PERM_PASSWORD_FILE)
         try:
-            content = self.passwd_file.read_text(encoding="utf-8")
-            for line in content.strip().split("\n"):
-                if not line or line.startswith("#"):
-                    continue
-                parts = line.split(":", 1)
-                if len(parts) == 2:
-                    username, password_hash = parts
-                    self._users[username] = password_hash
-            _LOGGER.debug("Loaded %d users from %s", len(self._users), self.passwd_file)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # closing the descriptor releases the lock
+
+    def _stat_key(self) -> tuple[int, int] | None:
+        """Return (mtime_ns, size) of the passwd file, or None if it is missing."""
+        try:
+            st = self.passwd_file.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load_users(self) -> dict[str, str]:
+        """Return users from the htpasswd file, skipping the parse if it is unchanged.
+
+        The returned dict is shared with the cache and must not be mutated.
+        """
+        key = self._stat_key()
+        if key is None:
+            self._cache = (None, {})
+            return {}
+        cached_key, cached_users = self._cache
+        if key == cached_key:
+            return cached_users
+
+        try:
+            users: dict[str, str] = {}
+            # Stream the file line by line rather than holding it all in memory
+            with self.passwd_file.open("r", encoding="utf-8") as fh:
+                for raw_line in fh:
+                    line = raw_line.rstrip("\r\n")
+                    if not line or line.startswith("#"):
+                        continue
+                    username, sep, password_hash = line.partition(":")
+                    if sep:
+                        users[username] = password_hash
+            self._cache = (key, users)
+            _LOGGER.debug("Loaded %d users from %s", len(users), self.passwd_file)
+            return users
         except Exception as ex:
             _LOGGER.error("Failed to load users from %s: %s", self.passwd_file, ex)
             raise
 
-    def _save_users(self) -> None:
-        """Save users to htpasswd file."""
-        lines = []
-        for username, password_hash in sorted(self._users.items()):
-            lines.append(f"{username}:{password_hash}")
-
-        content = "\n".join(lines)
-        if lines:
-            content += "\n"
+    def _save_users(self, users: dict[str, str]) -> None:
+        """Save ``users`` to the htpasswd file and make them the cached users.
 
-        self.passwd_file.write_text(content, encoding="utf-8")
-        self.passwd_file.chmod(PERM_PASSWORD_FILE)
-        _LOGGER.debug("Saved %d users to %s", len(self._users), self.passwd_file)
+        The file is written to a temporary sibling and renamed into place so
+        Squid's auth helper never observes a partially written file. The cache
+        is only replaced once the rename succeeded.
+        """
+        tmp_file = self.passwd_file.with_name(self.passwd_file.name + ".tmp")
+        try:
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, PERM_PASSWORD_FILE)
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                os.fchmod(fd, PERM_PASSWORD_FILE)
+                # Stream entries through the file buffer instead of joining one big string
+                fh.writelines(
+                    f"{username}:{password_hash}\n"
+                    for username, password_hash in sorted(users.items())
+                )
+            os.replace(tmp_file, self.passwd_file)
+        finally:
+            tmp_file.unlink(missing_ok=True)
+        # Prime the cache from what was just written instead of forcing a re-read
+        self._cache = (self._stat_key(), users)
+        _LOGGER.debug("Saved %d users to %s", len(users), self.passwd_file)
 
     def add_user(self, username: str, password: str) -> bool:
         """Add a new user.
@@ -69,50 +195,85 @@ class AuthManager:
         Raises:
             ValueError: If username or password is invalid
         """
-        # Validate username
-        if not USERNAME_RE.match(username):
-            raise ValueError("Username must be 1-64 chars and contain only a-z, 0-9, _ @ . -")
+        validate_credentials(username, password)
+        # MD5-crypt (apr1) hash compatible with Squid basic_ncsa_auth
+        password_hash = apr1_hash(password)
 
-        # Validate password
-        if not password or len(password) < 8:
-            raise ValueError("Password must be at least 8 characters")
+        with self._write_lock():
+            # Check if user already exists
+            if username in self._load_users():
+                _LOGGER.warning("User %s already exists", username)
+                return False
+            self._append_user(username, password_hash)
 
-        # Load existing users
-        self._load_users()
+        _LOGGER.info("Added user: %s", username)
+        return True
 
-        # Check if user already exists
-        if username in self._users:
-            _LOGGER.warning("User %s already exists", username)
-            return False
+    def _append_user(self, username: str, password_hash: str) -> None:
+        """Append a single htpasswd entry without rewriting the file.
 
-        # Generate MD5-crypt (apr1) hash compatible with Squid basic_ncsa_auth
-        # We use openssl command as it's the most reliable way on Alpine
+        A newline is prepended if the existing file does not end with one.
+        If the cache matched the file before the append it is advanced to the
+        new (mtime_ns, size) rather than invalidated. Call with the write lock held.
+        """
+        fd = os.open(self.passwd_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, PERM_PASSWORD_FILE)
         try:
-            import subprocess  # nosec B404
-
-            result = subprocess.run(  # nosec B603,B607
-                ["openssl", "passwd", "-apr1", "-stdin"],
-                input=password,
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            password_hash = result.stdout.strip()
-        except Exception as ex:
-            _LOGGER.error("Failed to generate password hash using openssl: %s", ex)
-            # Fallback to bcrypt if openssl fails (though it likely won't work with Squid)
-            import bcrypt
+            os.fchmod(fd, PERM_PASSWORD_FILE)
+            line = f"{username}:{password_hash}\n".encode()
+            st = os.fstat(fd)
+            before = (st.st_mtime_ns, st.st_size) if st.st_size else None
+            if st.st_size:
+                with open(self.passwd_file, "rb") as fh:
+                    fh.seek(st.st_size - 1)
+                    if fh.read(1) != b"\n":
+                        line = b"\n" + line
+            os.write(fd, line)
+            st = os.fstat(fd)
+            after = (st.st_mtime_ns, st.st_size)
+        finally:
+            os.close(fd)
+
+        cached_key, cached_users = self._cache
+        if before is None:
+            self._cache = (after, {username: password_hash})
+        elif cached_key == before:
+            self._cache = (after, {**cached_users, username: password_hash})
+
+    def add_users(self, users: list[dict[str, str]]) -> list[str]:
+        """Add several users with a single load and a single file write.
+
+        Invalid or duplicate entries are skipped with a warning so one bad
+        credential does not prevent the rest from being created.
 
-            password_bytes = password.encode("utf-8")
-            salt = bcrypt.gensalt()
-            password_hash = bcrypt.hashpw(password_bytes, salt).decode("utf-8")
+        Args:
+            users: List of dicts with ``username`` and ``password`` keys
 
-        # Add user
-        self._users[username] = password_hash
-        self._save_users()
+        Returns:
+            List of usernames that were added
+        """
+        with self._write_lock():
+            updated = dict(self._load_users())
+
+            added: list[str] = []
+            for user in users:
+                username = user.get("username", "")
+                password = user.get("password", "")
+                try:
+                    validate_credentials(username, password)
+                except ValueError as ex:
+                    _LOGGER.warning("Failed to add user %s: %s", username, ex)
+                    continue
+                if username in updated:
+                    _LOGGER.warning("User %s already exists", username)
+                    continue
+                updated[username] = apr1_hash(password)
+                added.append(username)
 
-        _LOGGER.info("Added user: %s", username)
-        return True
+            if added:
+                self._save_users(updated)
+        if added:
+            _LOGGER.info("Added %d user(s): %s", len(added), ", ".join(added))
+        return added
 
     def remove_user(self, username: str) -> bool:
         """Remove a user.
@@ -123,28 +284,45 @@ class AuthManager:
         Returns:
             True if user was removed, False if user doesn't exist
         """
-        # Load existing users
-        self._load_users()
+        return bool(self.remove_users([username]))
 
-        if username not in self._users:
-            _LOGGER.warning("User %s does not exist", username)
-            return False
+    def remove_users(self, usernames: Iterable[str]) -> list[str]:
+        """Remove several users with a single load and a single file write.
 
-        # Remove user
-        del self._users[username]
-        self._save_users()
+        Unknown usernames are skipped with a warning.
 
-        _LOGGER.info("Removed user: %s", username)
-        return True
+        Args:
+            usernames: Usernames to remove
+
+        Returns:
+            List of usernames that were removed
+        """
+        with self._write_lock():
+            updated = dict(self._load_users())
+
+            removed: list[str] = []
+            for username in usernames:
+                if updated.pop(username, None) is None:
+                    _LOGGER.warning("User %s does not exist", username)
+                    continue
+                removed.append(username)
+
+            if removed:
+                self._save_users(updated)
+        if removed:
+            _LOGGER.info("Removed user(s): %s", ", ".join(removed))
+        return removed
 
     def get_users(self) -> list[str]:
         """Get list of usernames.
 
+        Served from the parsed users, which are reused while the file's
+        mtime and size are unchanged.
+
         Returns:
             List of usernames
         """
-        self._load_users()
-        return sorted(self._users.keys())
+        return sorted(self._load_users())
 
     def get_user_count(self) -> int:
         """Get the number of users.
@@ -152,5 +330,4 @@ class AuthManager:
         Returns:
             Number of users
         """
-        self._load_users()
-        return len(self._users)
+        return len(self._load_users())
@@ -0,0 +1,23 @@
+"""Filesystem helpers shared by the config and certificate writers."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+PERM_CONFIG_FILE = 0o640
+
+
+def write_file(path: Path, data: bytes | str, mode: int = PERM_CONFIG_FILE) -> None:
+    """Write ``data`` to ``path`` with ``mode`` applied from the moment the file exists.
+
+    One open with the final mode instead of write-then-chmod, so the file (e.g.
+    a freshly written private key) never exists with umask-derived permissions.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    with os.fdopen(fd, "wb") as fh:
+        # O_CREAT mode is ignored for existing files and masked by umask
+        os.fchmod(fd, mode)
+        fh.write(data)
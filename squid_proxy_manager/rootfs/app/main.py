@@ -35,8 +35,12 @@ os.umask(0o077)
 try:
     import asyncio
     import hmac
+    import ipaddress
     import json
+    import re
     from pathlib import Path
+    from typing import Any
+    from urllib.parse import urlparse
 
     _EARLY_LOGGER.info("Core imports successful")
 except Exception as e:
@@ -58,7 +62,17 @@ sys.path.insert(0, "/app")
 _EARLY_LOGGER.info("Added /app to Python path")
 
 try:
+    from auth_manager import USERNAME_RE, validate_credentials
+    from cryptography import x509
+    from cryptography.x509.oid import NameOID
+    from ovpn_patcher import (
+        patch_ovpn_for_squid,
+        patch_ovpn_for_tls_tunnel,
+        validate_ovpn_content,
+    )
     from proxy_manager import (
+        PROXY_TYPE_SQUID,
+        PROXY_TYPE_TLS_TUNNEL,
         ProxyInstanceManager,
         _safe_path,
         validate_instance_name,
@@ -92,14 +106,17 @@ ALLOWED_ORIGINS = {
 # Allow extending CORS origins via environment variable (for Docker Compose dev setups)
 _extra_origins = os.environ.get("EXTRA_CORS_ORIGINS", "")
 if _extra_origins:
-    from urllib.parse import urlparse
-
     for _o in _extra_origins.split(","):
         _o = _o.strip()
         if _o and urlparse(_o).scheme in ("http", "https"):
             ALLOWED_ORIGINS.add(_o)
 API_LIMITER = AsyncLimiter(120, 60)
 API_REQUEST_TIMEOUT = 30
+LOG_TAIL_LINES = 100
+LOG_TAIL_CHUNK_SIZE = 8192
+LOG_TYPES = frozenset({"access", "cache", "nginx"})
+CLEARABLE_LOG_TYPES = frozenset({"access", "cache"})
+_MULTI_SLASH_RE = re.compile(r"/{2,}")
 
 # Manager will be initialized in main()
 manager = None
@@ -109,10 +126,8 @@ manager = None
 @web.middleware
 async def normalize_path_middleware(request, handler):
     """Normalize multiple slashes in path for ingress compatibility."""
-    import re
-
     original_path = request.path
-    normalized_path = re.sub(r"/+", "/", original_path)
+    normalized_path = _MULTI_SLASH_RE.sub("/", original_path)
 
     if normalized_path != original_path:
         _LOGGER.debug("Normalizing path: %s -> %s", original_path, normalized_path)
@@ -287,19 +302,33 @@ async def root_handler(request):
     return web.json_response(response_data)
 
 
-def _load_index_html() -> str | None:
-    """Load the SPA index.html from the built assets or dev frontend."""
+# (index path, mtime_ns, rendered HTML) - rebuilt only when index.html changes
+_index_cache: tuple[Path, int, str] | None = None
+
+
+def _render_index_html() -> str | None:
+    """Return index.html with server-side values substituted, cached by file mtime."""
+    global _index_cache
     index_path = (
         INDEX_HTML if INDEX_HTML.exists() else DEV_INDEX_HTML if DEV_INDEX_HTML.exists() else None
     )
     if not index_path:
         return None
-    return index_path.read_text(encoding="utf-8")
+    mtime_ns = index_path.stat().st_mtime_ns
+    if _index_cache is not None and _index_cache[:2] == (index_path, mtime_ns):
+        return _index_cache[2]
+
+    html_content = index_path.read_text(encoding="utf-8")
+    html_content = html_content.replace("__SUPERVISOR_TOKEN_VALUE__", json.dumps(HA_TOKEN)).replace(
+        "__APP_VERSION_VALUE__", json.dumps(APP_VERSION)
+    )
+    _index_cache = (index_path, mtime_ns, html_content)
+    return html_content
 
 
 async def web_ui_handler(request):
     """Serve web UI HTML page."""
-    html_content = _load_index_html()
+    html_content = _render_index_html()
     if html_content is None:
         return web.Response(
             text="UI build not found. Please build the frontend assets.",
@@ -307,9 +336,6 @@ async def web_ui_handler(request):
             content_type="text/plain",
         )
 
-    html_content = html_content.replace("__SUPERVISOR_TOKEN_VALUE__", json.dumps(HA_TOKEN)).replace(
-        "__APP_VERSION_VALUE__", json.dumps(APP_VERSION)
-    )
     response = web.Response(text=html_content, content_type="text/html")
     if HA_TOKEN:
         response.set_cookie(
@@ -365,7 +391,7 @@ async def create_instance(request):
         data = await request.json()
         name = data.get("name")
         port = data.get("port", 3128)
-        proxy_type = data.get("proxy_type", "squid")
+        proxy_type = data.get("proxy_type", PROXY_TYPE_SQUID)
         https_enabled = data.get("https_enabled", False)
         users = data.get("users", [])
         cert_params = data.get("cert_params")
@@ -424,8 +450,7 @@ async def stop_instance(request):
         name = _validated_name(request)
 
         # Verify instance exists
-        instances = await manager.get_instances()
-        if not any(i["name"] == name for i in instances):
+        if await manager.get_instance(name) is None:
             return web.json_response({"error": f"Instance {name} not found"}, status=404)
 
         success = await manager.stop_instance(name)
@@ -446,8 +471,7 @@ async def remove_instance(request):
         name = _validated_name(request)
 
         # Check if instance exists first
-        instances = await manager.get_instances()
-        if not any(i["name"] == name for i in instances):
+        if await manager.get_instance(name) is None:
             return web.json_response({"error": f"Instance '{name}' not found"}, status=404)
 
         success = await manager.remove_instance(name)
@@ -480,7 +504,7 @@ async def _check_squid_type(name: str) -> str | None:
     if manager is None:
         return None
     proxy_type = manager._get_proxy_type(name)
-    if proxy_type != "squid":
+    if proxy_type != PROXY_TYPE_SQUID:
         return f"User management is not available for {proxy_type} instances"
     return None
 
@@ -505,20 +529,60 @@ async def get_instance_users(request):
 
 
 async def add_instance_user(request):
-    """Add a user to an instance."""
+    """Add a user to an instance.
+
+    Accepts either ``{"username", "password"}`` or ``{"users": [...]}``; a list
+    is applied with a single passwd rewrite and at most one instance restart.
+    Any invalid entry rejects the whole batch; existing users are reported as
+    ``skipped``.
+    """
     if manager is None:
         return web.json_response({"error": "Manager not initialized"}, status=503)
     try:
         name = _validated_name(request)
+        data = await request.json()
+        # Reject malformed input before touching instance state
+        users = data.get("users")
+        if users is not None:
+            if not isinstance(users, list) or not all(
+                isinstance(u, dict)
+                and isinstance(u.get("username"), str)
+                and isinstance(u.get("password"), str)
+                for u in users
+            ):
+                return web.json_response(
+                    {"error": "users must be a list of objects with username and password"},
+                    status=400,
+                )
+            # Same rules as the single-user path; reject the batch instead of skipping
+            invalid = []
+            for user in users:
+                try:
+                    validate_credentials(user["username"], user["password"])
+                except ValueError as ex:
+                    invalid.append({"username": user["username"], "error": str(ex)})
+            if invalid:
+                return web.json_response(
+                    {"error": "Invalid user credentials", "invalid": invalid}, status=400
+                )
+        else:
+            username = data.get("username")
+            password = data.get("password")
+            if not isinstance(username, str) or not isinstance(password, str):
+                return web.json_response(
+                    {"error": "Username and password are required"}, status=400
+                )
+            validate_credentials(username, password)
+
         err = await _check_squid_type(name)
         if err:
             return web.json_response({"error": err}, status=400)
-        data = await request.json()
-        username = data.get("username")
-        password = data.get("password")
 
-        if not username or not password:
-            return web.json_response({"error": "Username and password are required"}, status=400)
+        if users is not None:
+            added = await manager.add_users(name, users)
+            # Entries not added already existed on the instance
+            skipped = [u["username"] for u in users if u["username"] not in added]
+            return web.json_response({"status": "users_added", "added": added, "skipped": skipped})
 
         success = await manager.add_user(name, username, password)
         if success:
@@ -538,19 +602,18 @@ async def remove_instance_user(request):
         return web.json_response({"error": "Manager not initialized"}, status=503)
     try:
         name = _validated_name(request)
-        err = await _check_squid_type(name)
-        if err:
-            return web.json_response({"error": err}, status=400)
         username = request.match_info.get("username")
 
         if not username:
             return web.json_response({"error": "Username is required"}, status=400)
 
-        import re as _re
-
-        if not _re.match(r"^[a-zA-Z0-9_@.-]{1,64}$", username):
+        if not USERNAME_RE.match(username):
             return web.json_response({"error": "Invalid username"}, status=400)
 
+        err = await _check_squid_type(name)
+        if err:
+            return web.json_response({"error": err}, status=400)
+
         success = await manager.remove_user(name, username)
         if success:
             return web.json_response({"status": "user_removed"})
@@ -563,6 +626,58 @@ async def remove_instance_user(request):
         return web.json_response({"error": "Internal server error"}, status=500)
 
 
+async def remove_instance_users(request):
+    """Remove several users from an instance with one passwd rewrite and restart."""
+    if manager is None:
+        return web.json_response({"error": "Manager not initialized"}, status=503)
+    try:
+        name = _validated_name(request)
+        data = await request.json()
+        # Reject malformed input before touching instance state
+        usernames = data.get("usernames")
+        if not isinstance(usernames, list) or not usernames:
+            return web.json_response({"error": "usernames must be a non-empty list"}, status=400)
+        if not all(isinstance(u, str) and USERNAME_RE.match(u) for u in usernames):
+            return web.json_response({"error": "Invalid username"}, status=400)
+
+        err = await _check_squid_type(name)
+        if err:
+            return web.json_response({"error": err}, status=400)
+
+        removed = await manager.remove_users(name, usernames)
+        return web.json_response({"status": "users_removed", "removed": removed})
+    except ValueError as ex:
+        _LOGGER.warning("Validation error removing users from %s: %s", name, ex)
+        return web.json_response({"error": str(ex)}, status=400)
+    except Exception as ex:
+        _LOGGER.error("Failed to remove users from %s: %s", name, ex)
+        return web.json_response({"error": "Internal server error"}, status=500)
+
+
+def _tail_lines(path: Path, lines: int = LOG_TAIL_LINES) -> str:
+    """Return the last ``lines`` lines of a file without reading all of it.
+
+    Reads fixed-size chunks backwards from the end until enough newlines
+    have been seen, so the cost is bounded by the tail size, not the file size.
+    Undecodable bytes (e.g. a multi-byte character cut by rotation) are replaced.
+    """
+    chunks: list[bytes] = []
+    newlines = 0
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        # lines + 1 newlines guarantee the first kept line is complete
+        while pos > 0 and newlines <= lines:
+            step = min(LOG_TAIL_CHUNK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            newlines += chunk.count(b"\n")
+            chunks.append(chunk)
+    data = b"".join(reversed(chunks))
+    tail = b"".join(data.splitlines(keepends=True)[-lines:])
+    return tail.decode("utf-8", errors="replace")
+
+
 async def get_instance_logs(request):
     """Get logs for an instance."""
     if manager is None:
@@ -571,16 +686,15 @@ async def get_instance_logs(request):
         name = _validated_name(request)
         log_type = request.query.get("type", "cache")  # 'cache', 'access', or 'nginx'
 
-        if log_type not in ("access", "cache", "nginx"):
+        if log_type not in LOG_TYPES:
             return web.json_response({"error": "Invalid log type"}, status=400)
 
         # Validate nginx logs are only for TLS tunnel instances
         if log_type == "nginx":
-            instances = await manager.get_instances()
-            instance = next((i for i in instances if i["name"] == name), None)
+            instance = await manager.get_instance(name)
             if not instance:
                 return web.json_response({"error": "Instance not found"}, status=404)
-            if instance.get("proxy_type") != "tls_tunnel":
+            if instance.get("proxy_type") != PROXY_TYPE_TLS_TUNNEL:
                 return web.json_response(
                     {"error": "Nginx logs are only available for TLS tunnel instances"}, status=400
                 )
@@ -592,10 +706,7 @@ async def get_instance_logs(request):
         if not log_file.exists():
             return web.Response(text=f"Log file {log_type}.log not found.")
 
-        # Return last 100 lines
-        with open(log_file) as f:
-            lines = f.readlines()
-            return web.Response(text="".join(lines[-100:]))
+        return web.Response(text=_tail_lines(log_file))
     except Exception as ex:
         _LOGGER.error("Failed to get logs for %s: %s", name, ex)
         return web.json_response({"error": "Internal server error"}, status=500)
@@ -609,7 +720,7 @@ async def clear_instance_logs(request):
         name = _validated_name(request)
         log_type = request.query.get("type", "access")
 
-        if log_type not in ("access", "cache"):
+        if log_type not in CLEARABLE_LOG_TYPES:
             return web.json_response({"error": "Invalid log type"}, status=400)
 
         import proxy_manager as _pmr  # runtime ref for test patching
@@ -627,6 +738,64 @@ async def clear_instance_logs(request):
         return web.json_response({"error": "Internal server error"}, status=500)
 
 
+# cert path -> ((mtime_ns, size), certificate info payload)
+_cert_info_cache: dict[Path, tuple[tuple[int, int], dict[str, Any]]] = {}
+
+
+def _certificate_info(cert_file: Path) -> dict[str, Any] | None:
+    """Return certificate details for the API, or None if the file is missing.
+
+    Parsed results are cached per file and reused while its mtime and size are
+    unchanged, so repeated UI polls cost a single stat.
+    """
+    try:
+        st = cert_file.stat()
+    except FileNotFoundError:
+        _cert_info_cache.pop(cert_file, None)
+        return None
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _cert_info_cache.get(cert_file)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    # Read once; parse the bytes and return the same PEM as text
+    cert_bytes = cert_file.read_bytes()
+    cert_pem = cert_bytes.decode("utf-8", errors="replace")
+
+    info: dict[str, Any]
+    try:
+        cert = x509.load_pem_x509_certificate(cert_bytes)
+        common_name = None
+        try:
+            cn = cert.subject.get_attributes_for_oid(NameOID.COMMON_NAME)
+            common_name = cn[0].value if cn else None
+        except Exception:
+            common_name = None
+
+        if hasattr(cert, "not_valid_before_utc"):
+            not_valid_before = cert.not_valid_before_utc
+        else:
+            not_valid_before = cert.not_valid_before
+
+        if hasattr(cert, "not_valid_after_utc"):
+            not_valid_after = cert.not_valid_after_utc
+        else:
+            not_valid_after = cert.not_valid_after
+
+        info = {
+            "status": "valid",
+            "common_name": common_name,
+            "not_valid_before": not_valid_before.isoformat() if not_valid_before else None,
+            "not_valid_after": not_valid_after.isoformat() if not_valid_after else None,
+            "pem": cert_pem,
+        }
+    except Exception as ex:
+        info = {"status": "invalid", "error": str(ex), "pem": cert_pem}
+
+    _cert_info_cache[cert_file] = (key, info)
+    return info
+
+
 async def get_instance_certificate_info(request):
     """Get certificate details for an instance."""
     if manager is None:
@@ -636,49 +805,14 @@ async def get_instance_certificate_info(request):
         import proxy_manager as _pmr  # runtime ref for test patching
 
         cert_file = _safe_path(_pmr.CERTS_DIR, name, "squid.crt")
-        if not cert_file.exists():
+        info = _certificate_info(cert_file)
+        if info is None:
             return web.json_response(
                 {"status": "missing", "message": "Certificate not found"}, status=404
             )
-
-        cert_pem = cert_file.read_text()
-
-        try:
-            from cryptography import x509
-            from cryptography.x509.oid import NameOID
-
-            cert = x509.load_pem_x509_certificate(cert_file.read_bytes())
-            common_name = None
-            try:
-                cn = cert.subject.get_attributes_for_oid(NameOID.COMMON_NAME)
-                common_name = cn[0].value if cn else None
-            except Exception:
-                common_name = None
-
-            if hasattr(cert, "not_valid_before_utc"):
-                not_valid_before = cert.not_valid_before_utc
-            else:
-                not_valid_before = cert.not_valid_before
-
-            if hasattr(cert, "not_valid_after_utc"):
-                not_valid_after = cert.not_valid_after_utc
-            else:
-                not_valid_after = cert.not_valid_after
-
-            return web.json_response(
-                {
-                    "status": "valid",
-                    "common_name": common_name,
-                    "not_valid_before": not_valid_before.isoformat() if not_valid_before else None,
-                    "not_valid_after": not_valid_after.isoformat() if not_valid_after else None,
-                    "pem": cert_pem,
-                }
-            )
-        except Exception as ex:
-            _LOGGER.error("Failed to parse certificate for %s: %s", name, ex)
-            return web.json_response(
-                {"status": "invalid", "error": str(ex), "pem": cert_pem}, status=200
-            )
+        if info["status"] == "invalid":
+            _LOGGER.error("Failed to parse certificate for %s: %s", name, info["error"])
+        return web.json_response(info)
     except Exception as ex:
         _LOGGER.error("Failed to read certificate info for %s: %s", name, ex)
         return web.json_response({"error": "Internal server error"}, status=500)
@@ -737,15 +871,59 @@ async def regenerate_instance_certs(request):
         return web.json_response({"error": "Internal server error"}, status=500)
 
 
+async def _run_curl(curl_args: list[str], timeout: float) -> tuple[int, str, str]:
+    """Run curl as an asyncio subprocess so the event loop is not blocked.
+
+    Returns:
+        Tuple of (returncode, stdout, stderr)
+
+    Raises:
+        asyncio.TimeoutError: If curl does not finish within ``timeout`` seconds
+    """
+    proc = await asyncio.create_subprocess_exec(  # nosec B603,B607
+        *curl_args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return (
+        proc.returncode if proc.returncode is not None else -1,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+async def _probe_tcp(host: str, port: int, timeout: float) -> str | None:
+    """Try a TCP connect without blocking the event loop.
+
+    Returns:
+        None if the connection succeeded, otherwise a short error description
+    """
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+    except asyncio.TimeoutError:
+        return f"Connection timed out after {timeout:g}s"
+    except OSError as ex:
+        return f"Connection failed: {ex.strerror or ex}"
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return None
+
+
 def _validate_target_url(url: str) -> str:
     """Validate target URL for connectivity test to prevent SSRF.
 
     Only allows http/https schemes and blocks private/loopback IPs.
     Returns the validated URL or raises ValueError.
     """
-    import ipaddress
-    from urllib.parse import urlparse
-
     parsed = urlparse(url)
     if parsed.scheme not in ("http", "https"):
         raise ValueError("Only http and https URLs are allowed")
@@ -779,17 +957,14 @@ async def test_instance_connectivity(request):
             return web.json_response({"error": "Username and password are required"}, status=400)
 
         # Get instance details
-        instances = await manager.get_instances()
-        instance = next((i for i in instances if i["name"] == name), None)
+        instance = await manager.get_instance(name)
         if not instance:
             return web.json_response({"error": "Instance not found"}, status=404)
 
         if not instance.get("running", False):
             return web.json_response({"error": "Instance is not running"}, status=400)
 
-        # Test connectivity using subprocess curl
-        import subprocess  # nosec B404
-
+        # Test connectivity using curl
         https_enabled = instance.get("https_enabled", False)
         protocol = "https" if https_enabled else "http"
         proxy_url = f"{protocol}://{username}:{password}@localhost:{instance['port']}"
@@ -816,14 +991,9 @@ async def test_instance_connectivity(request):
             if https_enabled:
                 curl_args.insert(3, "--proxy-insecure")
 
-            result = subprocess.run(  # nosec B603,B607
-                curl_args,
-                capture_output=True,
-                text=True,
-                timeout=15,
-            )
+            returncode, stdout, stderr = await _run_curl(curl_args, timeout=15)
 
-            success = result.returncode == 0 and result.stdout.strip() in [
+            success = returncode == 0 and stdout.strip() in [
                 "200",
                 "301",
                 "302",
@@ -833,12 +1003,12 @@ async def test_instance_connectivity(request):
             return web.json_response(
                 {
                     "status": "success" if success else "failed",
-                    "http_code": result.stdout.strip() if result.returncode == 0 else None,
-                    "error": result.stderr if not success and result.stderr else None,
+                    "http_code": stdout.strip() if returncode == 0 else None,
+                    "error": stderr if not success and stderr else None,
                     "message": f"Connection {'succeeded' if success else 'failed'}",
                 }
             )
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return web.json_response(
                 {"status": "failed", "error": "Connection timeout"}, status=500
             )
@@ -866,12 +1036,11 @@ async def test_tls_tunnel(request):
                 {"error": "Invalid test_type. Must be 'cover_site' or 'vpn_forward'"}, status=400
             )
 
-        instances = await manager.get_instances()
-        instance = next((i for i in instances if i["name"] == name), None)
+        instance = await manager.get_instance(name)
         if not instance:
             return web.json_response({"error": "Instance not found"}, status=404)
 
-        if instance.get("proxy_type") != "tls_tunnel":
+        if instance.get("proxy_type") != PROXY_TYPE_TLS_TUNNEL:
             return web.json_response({"error": "Instance is not a TLS tunnel"}, status=400)
 
         if not instance.get("running", False):
@@ -882,8 +1051,6 @@ async def test_tls_tunnel(request):
 
         if test_type == "cover_site":
             # Test HTTPS request to cover site
-            import subprocess  # nosec B404
-
             try:
                 curl_args = [
                     "curl",
@@ -899,13 +1066,8 @@ async def test_tls_tunnel(request):
                     "--connect-timeout",
                     "3",
                 ]
-                result = subprocess.run(  # nosec B603,B607
-                    curl_args,
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                )
-                success = result.returncode == 0 and result.stdout.strip() in [
+                returncode, stdout, stderr = await _run_curl(curl_args, timeout=10)
+                success = returncode == 0 and stdout.strip() in [
                     "200",
                     "301",
                     "302",
@@ -914,12 +1076,12 @@ async def test_tls_tunnel(request):
                 return web.json_response(
                     {
                         "status": "success" if success else "failed",
-                        "http_code": result.stdout.strip() if result.returncode == 0 else None,
-                        "error": result.stderr if not success and result.stderr else None,
+                        "http_code": stdout.strip() if returncode == 0 else None,
+                        "error": stderr if not success and stderr else None,
                         "message": f"Cover site {'accessible' if success else 'not accessible'}",
                     }
                 )
-            except subprocess.TimeoutExpired:
+            except asyncio.TimeoutError:
                 return web.json_response(
                     {"status": "failed", "error": "Connection timeout"}, status=500
                 )
@@ -930,24 +1092,17 @@ async def test_tls_tunnel(request):
                 )
 
         elif test_type == "vpn_forward":
-            # Test TCP connection to VPN server
-            import socket
-
+            # Test TCP connection to VPN server (DNS + connect without blocking the loop)
             try:
                 host, port_str = forward_address.rsplit(":", 1)
                 vpn_port = int(port_str)
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(5)
-                result_code = sock.connect_ex((host, vpn_port))
-                sock.close()
-                success = result_code == 0
+                error = await _probe_tcp(host, vpn_port, timeout=5)
+                success = error is None
                 return web.json_response(
                     {
                         "status": "success" if success else "failed",
                         "message": f"VPN server {'reachable' if success else 'unreachable'} at {forward_address}",
-                        "error": (
-                            f"Connection failed with code {result_code}" if not success else None
-                        ),
+                        "error": error,
                     }
                 )
             except Exception as sock_ex:
@@ -966,22 +1121,9 @@ async def test_tls_tunnel(request):
         return web.json_response({"error": "Internal server error"}, status=500)
 
 
-async def get_ovpn_snippet(request):
-    """Get OpenVPN .ovpn config snippet for an instance."""
-    if manager is None:
-        return web.json_response({"error": "Manager not initialized"}, status=503)
-    try:
-        name = _validated_name(request)
-        instances = await manager.get_instances()
-        instance = next((i for i in instances if i["name"] == name), None)
-        if not instance:
-            return web.json_response({"error": "Instance not found"}, status=404)
-
-        proxy_type = instance.get("proxy_type", "squid")
-        port = instance.get("port", 3128)
-
-        if proxy_type == "tls_tunnel":
-            snippet = f"""# TLS Tunnel configuration snippet for OpenVPN
+# OpenVPN client snippets per proxy type; only {port} is substituted
+OVPN_SNIPPET_TEMPLATES = {
+    PROXY_TYPE_TLS_TUNNEL: """# TLS Tunnel configuration snippet for OpenVPN
 # Add these lines to your .ovpn file
 
 client
@@ -996,9 +1138,8 @@ connect-retry-max 3
 # Important: The tls-crypt key comes from your OpenVPN server, not this addon.
 # This addon provides the transparent tunnel (nginx port-forwarding).
 # Configure your router to forward external:443 -> addon_ip:{port}
-"""
-        else:
-            snippet = f"""# Squid Proxy configuration snippet for OpenVPN
+""",
+    PROXY_TYPE_SQUID: """# Squid Proxy configuration snippet for OpenVPN
 # Add these lines to your .ovpn file
 
 client
@@ -1013,7 +1154,25 @@ http-proxy-option AGENT "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/5
 # your_username
 # your_password
 # </http-proxy-user-pass>
-"""
+""",
+}
+
+
+async def get_ovpn_snippet(request):
+    """Get OpenVPN .ovpn config snippet for an instance."""
+    if manager is None:
+        return web.json_response({"error": "Manager not initialized"}, status=503)
+    try:
+        name = _validated_name(request)
+        instance = await manager.get_instance(name)
+        if not instance:
+            return web.json_response({"error": "Instance not found"}, status=404)
+
+        proxy_type = instance.get("proxy_type", PROXY_TYPE_SQUID)
+        port = instance.get("port", 3128)
+
+        template = OVPN_SNIPPET_TEMPLATES.get(proxy_type, OVPN_SNIPPET_TEMPLATES[PROXY_TYPE_SQUID])
+        snippet = template.format(port=port)
         return web.Response(text=snippet, content_type="text/plain")
     except Exception as ex:
         _LOGGER.error("Failed to get ovpn snippet for %s: %s", name, ex)
@@ -1022,7 +1181,6 @@ http-proxy-option AGENT "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/5
 
 async def patch_ovpn_config(request):
     """Patch uploaded .ovpn file with proxy settings."""
-    from ovpn_patcher import patch_ovpn_for_squid, patch_ovpn_for_tls_tunnel, validate_ovpn_content
 
     name = _validated_name(request)
 
@@ -1038,8 +1196,7 @@ async def patch_ovpn_config(request):
         return web.json_response({"error": "Manager not initialized"}, status=503)
 
     # Get instance metadata
-    instances = await mgr.get_instances()
-    instance = next((i for i in instances if i["name"] == name), None)
+    instance = await mgr.get_instance(name)
     if not instance:
         return web.json_response({"error": "Instance not found"}, status=404)
 
@@ -1072,11 +1229,11 @@ async def patch_ovpn_config(request):
     # Determine proxy host and port
     proxy_host = external_host or instance.get("external_ip") or "localhost"
     proxy_port = instance["port"]
-    proxy_type = instance.get("proxy_type", "squid")
+    proxy_type = instance.get("proxy_type", PROXY_TYPE_SQUID)
 
     # Patch config based on proxy type
     try:
-        if proxy_type == "squid":
+        if proxy_type == PROXY_TYPE_SQUID:
             patched_content = patch_ovpn_for_squid(
                 file_content, proxy_host, proxy_port, username, password
             )
@@ -1136,6 +1293,7 @@ async def start_app():
     # User management API
     app.router.add_get("/api/instances/{name}/users", get_instance_users)
     app.router.add_post("/api/instances/{name}/users", add_instance_user)
+    app.router.add_delete("/api/instances/{name}/users", remove_instance_users)
     app.router.add_delete("/api/instances/{name}/users/{username}", remove_instance_user)
     app.router.add_post("/api/instances/{name}/test", test_instance_connectivity)
     app.router.add_post("/api/instances/{name}/test-tunnel", test_tls_tunnel)
@@ -1245,7 +1403,7 @@ async def main():
                     try:
                         name = instance_config.get("name")
                         port = instance_config.get("port", 3128)
-                        proxy_type = instance_config.get("proxy_type", "squid")
+                        proxy_type = instance_config.get("proxy_type", PROXY_TYPE_SQUID)
                         https_enabled = instance_config.get("https_enabled", False)
                         users = instance_config.get("users", [])
                         forward_address = instance_config.get("forward_address")
@@ -4,16 +4,27 @@
 from __future__ import annotations
 
 import asyncio
-import grp
+import json
 import logging
 import os
-import pwd
 import re
+import shutil
 import signal
 import subprocess  # nosec B404
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from auth_manager import AuthManager
+from cert_manager import KEY_TYPE_ECDSA, CertificateManager
+from cryptography import x509
+from squid_config import SquidConfigGenerator, resolve_squid_account
+from tls_tunnel_config import (
+    TlsTunnelConfigGenerator,
+    normalize_forward_address,
+    validate_forward_address,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 # Paths
@@ -24,21 +35,32 @@ LOGS_DIR = CONFIG_DIR / "logs"
 SQUID_BINARY = "/usr/sbin/squid"
 NGINX_BINARY = "/usr/sbin/nginx"
 INSTANCE_NAME_RE = re.compile(r"^[a-zA-Z0-9_-]{1,64}$")
-VALID_PROXY_TYPES = ("squid", "tls_tunnel")
+PROXY_TYPE_SQUID = "squid"
+PROXY_TYPE_TLS_TUNNEL = "tls_tunnel"
+VALID_PROXY_TYPES = (PROXY_TYPE_SQUID, PROXY_TYPE_TLS_TUNNEL)
+STOP_TIMEOUT = 5.0
+KILL_REAP_TIMEOUT = 3.0
+# Graceful-stop signal per proxy type: nginx drains on SIGQUIT, Squid stops on SIGTERM
+STOP_SIGNALS = {
+    PROXY_TYPE_SQUID: signal.SIGTERM,
+    PROXY_TYPE_TLS_TUNNEL: signal.SIGQUIT,
+}
+LEGACY_HTTP_PORT_RE = re.compile(r"^http_port (\d+)", re.MULTILINE)
 
 
 def _resolve_effective_user_group() -> tuple[int, int] | None:
-    """Resolve a non-root user/group for Squid when running as root."""
+    """Return the uid/gid Squid's files are chowned to when running as root.
+
+    Uses the same cached account lookup that writes cache_effective_user into
+    squid.conf, so file ownership always matches the user Squid runs as.
+    """
     if os.getuid() != 0:
         return None
-    for username in ("proxy", "squid", "nobody"):
-        try:
-            user = pwd.getpwnam(username)
-            group = grp.getgrgid(user.pw_gid)
-            return user.pw_uid, group.gr_gid
-        except KeyError:
-            continue
-    return None
+    account = resolve_squid_account()
+    if account is None:
+        return None
+    _, _, uid, gid = account
+    return uid, gid
 
 
 def _maybe_chown(path: Path, uid: int, gid: int) -> None:
@@ -49,6 +71,81 @@ def _maybe_chown(path: Path, uid: int, gid: int) -> None:
         _LOGGER.debug("Failed to chown %s to %d:%d", path, uid, gid)
 
 
+def _prepare_passwd_file(
+    auth_manager: AuthManager, users: list[dict[str, str]] | None
+) -> list[str]:
+    """Create the htpasswd file with initial users, permissions and ownership.
+
+    Blocking; call via asyncio.to_thread. Returns the usernames that were added.
+    """
+    passwd_file = auth_manager.passwd_file
+    added = auth_manager.add_users(users) if users else []
+    if not passwd_file.exists():
+        passwd_file.touch()
+    passwd_file.chmod(0o640)
+    resolved = _resolve_effective_user_group()
+    if resolved:
+        uid, gid = resolved
+        _maybe_chown(passwd_file, uid, gid)
+    return added
+
+
+async def _wait_for_exit(process: subprocess.Popen, timeout: float) -> bool:
+    """Wait up to ``timeout`` seconds for ``process`` to exit and reap it."""
+    try:
+        await asyncio.to_thread(process.wait, timeout)
+    except subprocess.TimeoutExpired:
+        return False
+    return True
+
+
+def _verify_cert_pair(name: str, cert_file: Path, key_file: Path) -> x509.Certificate:
+    """Check a generated cert/key pair exists, is non-empty and parses.
+
+    Uses one stat per file instead of separate exists()/stat() calls.
+    Blocking; call via asyncio.to_thread.
+    """
+    try:
+        cert_size = cert_file.stat().st_size
+        key_size = key_file.stat().st_size
+    except FileNotFoundError as ex:
+        raise RuntimeError(f"Failed to generate certificates for {name}") from ex
+    if cert_size == 0 or key_size == 0:
+        raise RuntimeError(f"Generated certificates for {name} are empty")
+    try:
+        return x509.load_pem_x509_certificate(cert_file.read_bytes())
+    except Exception as ex:
+        raise RuntimeError(f"Generated certificate for {name} is invalid: {ex}") from ex
+
+
+def _reserved_dir_names() -> set[str]:
+    """Names of the shared directories that live alongside instance directories."""
+    return {CERTS_DIR.name, LOGS_DIR.name}
+
+
+def _list_instance_names() -> list[str]:
+    """List validated instance directory names under CONFIG_DIR.
+
+    Uses a single scandir pass (d_type avoids a stat per entry) and skips the
+    shared certs/logs directories, which create_instance refuses as names.
+    """
+    reserved = _reserved_dir_names()
+    names: list[str] = []
+    try:
+        with os.scandir(CONFIG_DIR) as entries:
+            for entry in entries:
+                if entry.name in reserved or not entry.is_dir():
+                    continue
+                # Validate directory name to prevent path traversal (CodeQL py/path-injection)
+                try:
+                    names.append(validate_instance_name(entry.name))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return names
+
+
 def validate_instance_name(name: str) -> str:
     """Validate and sanitize instance name to prevent path traversal/injection.
 
@@ -96,6 +193,15 @@ class ProxyInstanceManager:
         """Initialize the manager."""
         self.processes: dict[str, subprocess.Popen] = {}
         self._log_handles: dict[str, Any] = {}
+        # instance.json path -> ((mtime_ns, size), parsed metadata)
+        self._metadata_cache: dict[Path, tuple[tuple[int, int], dict[str, Any]]] = {}
+        # default binary path -> resolved executable path
+        self._binaries: dict[str, str] = {}
+        # instance name -> AuthManager bound to that instance's passwd file
+        self._auth_managers: dict[str, AuthManager] = {}
+        # instance name -> user-change restart that has been requested but not begun
+        self._pending_restarts: dict[str, asyncio.Future[bool]] = {}
+        self._restart_locks: dict[str, asyncio.Lock] = {}
         # Ensure directories exist
         CONFIG_DIR.mkdir(parents=True, exist_ok=True)
         CERTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -117,7 +223,7 @@ class ProxyInstanceManager:
         https_enabled: bool = False,
         users: list[dict[str, str]] | None = None,
         cert_params: dict[str, Any] | None = None,
-        proxy_type: str = "squid",
+        proxy_type: str = PROXY_TYPE_SQUID,
         forward_address: str | None = None,
         cover_domain: str | None = None,
         rate_limit: int = 10,
@@ -140,17 +246,18 @@ class ProxyInstanceManager:
         try:
             name = validate_instance_name(name)
             name = os.path.basename(name)  # CodeQL path-injection sanitiser
+            if name in _reserved_dir_names():
+                # The instance directory would be the shared certs/logs directory
+                raise ValueError(f"Instance name '{name}' is reserved")
             validate_port(port)
             if proxy_type not in VALID_PROXY_TYPES:
                 raise ValueError(
                     f"Invalid proxy_type: {proxy_type}. Must be one of {VALID_PROXY_TYPES}"
                 )
 
-            if proxy_type == "tls_tunnel":
+            if proxy_type == PROXY_TYPE_TLS_TUNNEL:
                 if not forward_address:
                     raise ValueError("forward_address is required for tls_tunnel proxy type")
-                from tls_tunnel_config import normalize_forward_address, validate_forward_address
-
                 validate_forward_address(forward_address)
                 # Normalize to always include port (defaults to 443)
                 forward_address = normalize_forward_address(forward_address)
@@ -172,8 +279,6 @@ class ProxyInstanceManager:
             ]:
                 if problematic_path.exists() and problematic_path.is_dir():
                     _LOGGER.info("Cleaning up problematic directory: %s", problematic_path)
-                    import shutil
-
                     shutil.rmtree(problematic_path)
 
             instance_dir.mkdir(parents=True, exist_ok=True)
@@ -187,9 +292,7 @@ class ProxyInstanceManager:
                 _maybe_chown(instance_dir, uid, gid)
                 _maybe_chown(instance_logs_dir, uid, gid)
 
-            import json
-
-            if proxy_type == "tls_tunnel":
+            if proxy_type == PROXY_TYPE_TLS_TUNNEL:
                 return await self._create_tls_tunnel_instance(
                     name,
                     port,
@@ -202,106 +305,38 @@ class ProxyInstanceManager:
 
             # --- Squid proxy type (existing behavior) ---
 
-            # Generate Squid configuration
-            from squid_config import SquidConfigGenerator
-
+            # Generate Squid configuration and save instance metadata in one thread hop
             config_gen = SquidConfigGenerator(name, port, https_enabled, str(CONFIG_DIR))
-            config_file = instance_dir / "squid.conf"
-            config_gen.generate_config(config_file)
-            resolved = _resolve_effective_user_group()
-            if resolved:
-                uid, gid = resolved
-                _maybe_chown(config_file, uid, gid)
-
-            # Save instance metadata
-            metadata_file = instance_dir / "instance.json"
             metadata = {
                 "name": name,
-                "proxy_type": "squid",
+                "proxy_type": PROXY_TYPE_SQUID,
                 "port": port,
                 "https_enabled": https_enabled,
                 "external_ip": "",
-                "created_at": __import__("datetime").datetime.now().isoformat(),
+                "created_at": datetime.now().isoformat(),
             }
-            metadata_file.write_text(json.dumps(metadata, indent=2))
+            await asyncio.to_thread(
+                self._write_squid_instance_files, config_gen, instance_dir, metadata
+            )
 
-            # Handle HTTPS certificate - always regenerate when HTTPS is enabled
-            cert_file = None
-            key_file = None
+            # Certificate keygen and passwd hashing are independent; run them concurrently
+            # (HTTPS certificate is always regenerated when HTTPS is enabled)
+            passwd_task = asyncio.to_thread(
+                _prepare_passwd_file, self._get_auth_manager(name), users
+            )
             if https_enabled:
                 _LOGGER.info("=== HTTPS Certificate Generation for %s ===", name)
-
-                instance_cert_dir = _safe_path(CERTS_DIR, name)
-                if instance_cert_dir.exists():
-                    import shutil
-
-                    shutil.rmtree(instance_cert_dir, ignore_errors=True)
-
-                instance_cert_dir.mkdir(parents=True, exist_ok=True)
-                instance_cert_dir.chmod(0o750)
-                resolved = _resolve_effective_user_group()
-                if resolved:
-                    uid, gid = resolved
-                    _maybe_chown(instance_cert_dir, uid, gid)
-
-                from cert_manager import CertificateManager
-
-                cert_manager = CertificateManager(CERTS_DIR, name)
-                cert_params = cert_params or {}
-
-                cert_file, key_file = await cert_manager.generate_certificate(
-                    validity_days=cert_params.get("validity_days", 365),
-                    key_size=cert_params.get("key_size", 2048),
-                    common_name=cert_params.get("common_name"),
-                    country=cert_params.get("country", "US"),
-                    organization=cert_params.get("organization", "Squid Proxy Manager"),
+                loaded_cert, _ = await asyncio.gather(
+                    self._generate_instance_cert(name, cert_params), passwd_task
+                )
+                _LOGGER.info(
+                    "Certificate loaded: subject=%s, valid until %s",
+                    loaded_cert.subject.rfc4514_string(),
+                    loaded_cert.not_valid_after_utc,
                 )
-
-                await asyncio.sleep(0.5)
-
-                if not cert_file.exists() or not key_file.exists():
-                    raise RuntimeError(f"Failed to generate certificates for {name}")
-
-                cert_stat = cert_file.stat()
-                key_stat = key_file.stat()
-                if cert_stat.st_size == 0 or key_stat.st_size == 0:
-                    raise RuntimeError(f"Generated certificates for {name} are empty")
-
-                try:
-                    from cryptography import x509
-
-                    cert_data = cert_file.read_bytes()
-                    loaded_cert = x509.load_pem_x509_certificate(cert_data)
-                    _LOGGER.info(
-                        "Certificate loaded: subject=%s, valid until %s",
-                        loaded_cert.subject.rfc4514_string(),
-                        loaded_cert.not_valid_after_utc,
-                    )
-                except Exception as ex:
-                    raise RuntimeError(f"Generated certificate for {name} is invalid: {ex}") from ex
-
                 _LOGGER.info("=== Certificate generation complete for %s ===", name)
-
-            # Create password file
-            passwd_file = instance_dir / "passwd"
-            if users:
-                from auth_manager import AuthManager
-
-                auth_manager = AuthManager(passwd_file)
-                for user in users:
-                    try:
-                        auth_manager.add_user(user["username"], user["password"])
-                    except ValueError as ex:
-                        _LOGGER.warning("Failed to add user %s: %s", user.get("username"), ex)
             else:
-                passwd_file.touch()
-                passwd_file.chmod(0o640)
-            if passwd_file.exists():
-                passwd_file.chmod(0o640)
-                resolved = _resolve_effective_user_group()
-                if resolved:
-                    uid, gid = resolved
-                    _maybe_chown(passwd_file, uid, gid)
+                await passwd_task
 
             # Start Squid process
             success = await self.start_instance(name)
@@ -310,7 +345,7 @@ class ProxyInstanceManager:
 
             return {
                 "name": name,
-                "proxy_type": "squid",
+                "proxy_type": PROXY_TYPE_SQUID,
                 "port": port,
                 "https_enabled": https_enabled,
                 "status": "running",
@@ -320,6 +355,32 @@ class ProxyInstanceManager:
             _LOGGER.error("Failed to create instance %s: %s", name, ex)
             raise
 
+    async def _generate_instance_cert(
+        self, name: str, cert_params: dict[str, Any] | None
+    ) -> x509.Certificate:
+        """Replace the instance's HTTPS certificate pair and return the verified cert."""
+        instance_cert_dir = _safe_path(CERTS_DIR, name)
+        if instance_cert_dir.exists():
+            shutil.rmtree(instance_cert_dir, ignore_errors=True)
+
+        instance_cert_dir.mkdir(parents=True, exist_ok=True)
+        instance_cert_dir.chmod(0o750)
+        resolved = _resolve_effective_user_group()
+        if resolved:
+            uid, gid = resolved
+            _maybe_chown(instance_cert_dir, uid, gid)
+
+        cert_manager = CertificateManager(CERTS_DIR, name)
+        cert_params = cert_params or {}
+        cert_file, key_file = await cert_manager.generate_certificate(
+            validity_days=cert_params.get("validity_days", 365),
+            key_size=cert_params.get("key_size", 2048),
+            common_name=cert_params.get("common_name"),
+            country=cert_params.get("country", "US"),
+            organization=cert_params.get("organization", "Squid Proxy Manager"),
+        )
+        return await asyncio.to_thread(_verify_cert_pair, name, cert_file, key_file)
+
     async def _create_tls_tunnel_instance(
         self,
         name: str,
@@ -333,8 +394,6 @@ class ProxyInstanceManager:
         """Create a TLS tunnel (nginx SNI multiplexer) instance."""
         name = validate_instance_name(name)
         name = os.path.basename(name)  # CodeQL path-injection sanitiser
-        import json
-
         # Allocate a local port for the cover website backend
         cover_site_port = port + 10000
         if cover_site_port > 65535:
@@ -342,33 +401,21 @@ class ProxyInstanceManager:
         if cover_site_port > 65535:
             cover_site_port = 9443
 
-        # Generate cover site SSL certificate
+        # Generate cover site SSL certificate into <instance_dir>/certs/cover.{crt,key}
         # Security audit: instance_dir from _safe_path(CONFIG_DIR, name) — name validated
         # by validate_instance_name() regex ^[a-zA-Z0-9_-]{1,64}$ + os.path.basename().
-        # "certs" is a hardcoded literal. No path injection possible.
-        cover_cert_dir = instance_dir / "certs"  # lgtm[py/path-injection]
-        cover_cert_dir.mkdir(parents=True, exist_ok=True)  # lgtm[py/path-injection]
-        cover_cert_dir.chmod(0o750)
-
-        from cert_manager import CertificateManager
-
-        # Use a temporary CertificateManager with instance-local cert dir
-        cert_mgr = CertificateManager(instance_dir, "certs")
-        # Override cert paths since we're using a non-standard layout
-        cert_mgr.cert_dir = cover_cert_dir
-        cert_mgr.cert_file = cover_cert_dir / "cover.crt"
-        cert_mgr.key_file = cover_cert_dir / "cover.key"
+        # "certs" and "cover" are hardcoded literals. No path injection possible.
+        cert_mgr = CertificateManager(instance_dir, "certs", cert_name="cover")
 
         cn = cover_domain or f"tunnel-{name}"
         cert_file, key_file = await cert_mgr.generate_certificate(
             common_name=cn,
             organization="TLS Tunnel Cover Site",
+            key_type=KEY_TYPE_ECDSA,
         )
         _LOGGER.info("Generated cover site certificate for %s (CN: %s)", name, cn)
 
         # Generate nginx configs
-        from tls_tunnel_config import TlsTunnelConfigGenerator
-
         config_gen = TlsTunnelConfigGenerator(
             instance_name=name,
             listen_port=port,
@@ -394,16 +441,16 @@ class ProxyInstanceManager:
         metadata_file = instance_dir / "instance.json"
         metadata = {
             "name": name,
-            "proxy_type": "tls_tunnel",
+            "proxy_type": PROXY_TYPE_TLS_TUNNEL,
             "port": port,
             "forward_address": forward_address,
             "cover_domain": cover_domain or "",
             "cover_site_port": cover_site_port,
             "rate_limit": rate_limit,
             "external_ip": "",
-            "created_at": __import__("datetime").datetime.now().isoformat(),
+            "created_at": datetime.now().isoformat(),
         }
-        metadata_file.write_text(json.dumps(metadata, indent=2))  # lgtm[py/path-injection]
+        self._write_metadata(metadata_file, metadata)
 
         # Start nginx
         success = await self.start_instance(name)
@@ -412,7 +459,7 @@ class ProxyInstanceManager:
 
         return {
             "name": name,
-            "proxy_type": "tls_tunnel",
+            "proxy_type": PROXY_TYPE_TLS_TUNNEL,
             "port": port,
             "forward_address": forward_address,
             "cover_domain": cover_domain or "",
@@ -420,110 +467,196 @@ class ProxyInstanceManager:
             "status": "running",
         }
 
-    async def get_instances(self) -> list[dict[str, Any]]:
-        """Get list of all proxy instances."""
-        instances: list[dict[str, Any]] = []
-        if not CONFIG_DIR.exists():
-            return instances
+    def _resolve_binary(self, default_path: str, program: str) -> str | None:
+        """Return the executable for ``program``, resolving it only once per manager.
 
-        import json
+        Prefers ``default_path`` and falls back to a PATH lookup. Failed lookups
+        are not cached so a binary installed later is still picked up.
+        """
+        cached = self._binaries.get(default_path)
+        if cached is not None:
+            return cached
+        if os.path.exists(default_path):
+            resolved = default_path
+        else:
+            _LOGGER.warning("%s binary not found at %s", program, default_path)
+            found = shutil.which(program)
+            if not found:
+                return None
+            _LOGGER.info("Found %s at %s via PATH", program, found)
+            resolved = found
+        self._binaries[default_path] = resolved
+        return resolved
+
+    def _is_running(self, name: str) -> bool:
+        """Return True if a process for ``name`` is tracked and still alive."""
+        process = self.processes.get(name)
+        return process is not None and process.poll() is None
+
+    def _get_auth_manager(self, name: str) -> AuthManager:
+        """Return the cached AuthManager for an instance, creating it on first use.
+
+        ``name`` must already be validated.
+        """
+        auth_manager = self._auth_managers.get(name)
+        if auth_manager is None:
+            auth_manager = AuthManager(_safe_path(CONFIG_DIR, name, "passwd"))
+            self._auth_managers[name] = auth_manager
+        return auth_manager
 
-        for item in CONFIG_DIR.iterdir():
-            if not item.is_dir():
-                continue
+    def _read_metadata(self, metadata_file: Path) -> dict[str, Any] | None:
+        """Read instance.json, reusing the parsed copy while its mtime is unchanged.
 
-            # Validate directory name to prevent path traversal (CodeQL py/path-injection)
-            try:
-                name = validate_instance_name(item.name)
-            except ValueError:
-                continue
+        Returns None if the file does not exist. Parse errors propagate to the caller.
+        """
+        try:
+            st = metadata_file.stat()
+        except FileNotFoundError:
+            self._metadata_cache.pop(metadata_file, None)
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._metadata_cache.get(metadata_file)
+        if cached is not None and cached[0] == key:
+            return dict(cached[1])
+        metadata = json.loads(metadata_file.read_text())  # lgtm[py/path-injection]
+        self._metadata_cache[metadata_file] = (key, metadata)
+        return dict(metadata)
+
+    def _write_metadata(self, metadata_file: Path, metadata: dict[str, Any]) -> None:
+        """Write instance.json and prime the metadata cache with what was written.
+
+        The cache is keyed on (mtime_ns, size), which does not change when a
+        same-length rewrite lands within one mtime tick (e.g. "running" ->
+        "stopped"), so our own writes must refresh the cached copy directly.
+        """
+        metadata_file.write_text(json.dumps(metadata, indent=2))  # lgtm[py/path-injection]
+        st = metadata_file.stat()
+        self._metadata_cache[metadata_file] = ((st.st_mtime_ns, st.st_size), dict(metadata))
 
-            # Re-derive the validated path from CONFIG_DIR + sanitized name
-            instance_dir = _safe_path(CONFIG_DIR, name)
-            metadata_file = instance_dir / "instance.json"
-            has_squid_conf = (instance_dir / "squid.conf").exists()
+    def _write_squid_instance_files(
+        self, config_gen: SquidConfigGenerator, instance_dir: Path, metadata: dict[str, Any]
+    ) -> None:
+        """Write squid.conf (with ownership) and instance.json for a Squid instance.
 
-            # Detect instances: must have instance.json OR squid.conf (legacy)
-            if not metadata_file.exists() and not has_squid_conf:
-                continue
-            is_running = name in self.processes and self.processes[name].poll() is None
+        Blocking; call via asyncio.to_thread.
+        """
+        config_file = instance_dir / "squid.conf"
+        config_gen.generate_config(config_file)
+        resolved = _resolve_effective_user_group()
+        if resolved:
+            uid, gid = resolved
+            _maybe_chown(config_file, uid, gid)
+        self._write_metadata(instance_dir / "instance.json", metadata)
 
-            # Read metadata
-            port = 3128
-            https_enabled = False
-            proxy_type = "squid"
-            forward_address = ""
-            cover_domain = ""
-            rate_limit = 10
+    def _build_instance_data(self, name: str) -> dict[str, Any] | None:
+        """Build the API view of one instance, or None if it does not exist.
 
-            if metadata_file.exists():
-                try:
-                    metadata = json.loads(metadata_file.read_text())
-                    port = metadata.get("port", port)
-                    https_enabled = metadata.get("https_enabled", False)
-                    # Backward compatibility: read but ignore dpi_prevention from old instance.json
-                    proxy_type = metadata.get("proxy_type", "squid")
-                    forward_address = metadata.get("forward_address", "")
-                    cover_domain = metadata.get("cover_domain", "")
-                    rate_limit = metadata.get("rate_limit", 10)
-                except Exception as ex:
-                    _LOGGER.warning("Failed to read metadata for %s: %s", name, ex)
-            elif has_squid_conf:
-                # Legacy fallback: parse squid.conf
-                try:
-                    config_content = (instance_dir / "squid.conf").read_text()
-                    import re as _re
+        ``name`` must already be validated. Blocking; call via asyncio.to_thread.
+        """
+        # Re-derive the validated path from CONFIG_DIR + sanitized name
+        instance_dir = _safe_path(CONFIG_DIR, name)
+        metadata_file = instance_dir / "instance.json"
+        has_squid_conf = (instance_dir / "squid.conf").exists()
 
-                    port_match = _re.search(r"^http_port (\d+)", config_content, _re.MULTILINE)
-                    if port_match:
-                        port = int(port_match.group(1))
-                    https_enabled = "https_port" in config_content
-                except Exception as ex:
-                    _LOGGER.warning("Failed to parse squid.conf for %s: %s", name, ex)
+        # Detect instances: must have instance.json OR squid.conf (legacy)
+        if not metadata_file.exists() and not has_squid_conf:
+            return None
+        is_running = self._is_running(name)
 
-            instance_data: dict[str, Any] = {
-                "name": name,
-                "proxy_type": proxy_type,
-                "port": port,
-                "status": "running" if is_running else "stopped",
-                "running": is_running,
-            }
+        # Read metadata
+        port = 3128
+        https_enabled = False
+        proxy_type = PROXY_TYPE_SQUID
+        forward_address = ""
+        cover_domain = ""
+        rate_limit = 10
 
-            if proxy_type == "tls_tunnel":
-                instance_data["forward_address"] = forward_address
-                instance_data["cover_domain"] = cover_domain
-                instance_data["rate_limit"] = rate_limit
-                instance_data["https_enabled"] = False
-            else:
-                instance_data["https_enabled"] = https_enabled
+        if metadata_file.exists():
+            try:
+                metadata = self._read_metadata(metadata_file) or {}
+                port = metadata.get("port", port)
+                https_enabled = metadata.get("https_enabled", False)
+                # Backward compatibility: read but ignore dpi_prevention from old instance.json
+                proxy_type = metadata.get("proxy_type", PROXY_TYPE_SQUID)
+                forward_address = metadata.get("forward_address", "")
+                cover_domain = metadata.get("cover_domain", "")
+                rate_limit = metadata.get("rate_limit", 10)
+            except Exception as ex:
+                _LOGGER.warning("Failed to read metadata for %s: %s", name, ex)
+        elif has_squid_conf:
+            # Legacy fallback: parse squid.conf
+            try:
+                config_content = (instance_dir / "squid.conf").read_text()
+                port_match = LEGACY_HTTP_PORT_RE.search(config_content)
+                if port_match:
+                    port = int(port_match.group(1))
+                https_enabled = "https_port" in config_content
+            except Exception as ex:
+                _LOGGER.warning("Failed to parse squid.conf for %s: %s", name, ex)
 
-                user_count = 0
-                passwd_file = instance_dir / "passwd"
-                if passwd_file.exists():
-                    try:
-                        from auth_manager import AuthManager
+        instance_data: dict[str, Any] = {
+            "name": name,
+            "proxy_type": proxy_type,
+            "port": port,
+            "status": "running" if is_running else "stopped",
+            "running": is_running,
+        }
 
-                        auth_manager = AuthManager(passwd_file)
-                        user_count = auth_manager.get_user_count()
-                    except Exception as ex:
-                        _LOGGER.warning("Failed to read users for %s: %s", name, ex)
-                instance_data["user_count"] = user_count
+        if proxy_type == PROXY_TYPE_TLS_TUNNEL:
+            instance_data["forward_address"] = forward_address
+            instance_data["cover_domain"] = cover_domain
+            instance_data["rate_limit"] = rate_limit
+            instance_data["https_enabled"] = False
+        else:
+            instance_data["https_enabled"] = https_enabled
 
-            instances.append(instance_data)
+            # A missing passwd file counts as zero users
+            user_count = 0
+            try:
+                user_count = self._get_auth_manager(name).get_user_count()
+            except Exception as ex:
+                _LOGGER.warning("Failed to read users for %s: %s", name, ex)
+            instance_data["user_count"] = user_count
+
+        return instance_data
+
+    async def get_instance(self, name: str) -> dict[str, Any] | None:
+        """Get a single proxy instance by name without scanning all instances."""
+        name = validate_instance_name(name)
+        name = os.path.basename(name)  # CodeQL path-injection sanitiser
+        return await asyncio.to_thread(self._build_instance_data, name)
+
+    def _collect_instances(self) -> list[dict[str, Any]]:
+        """Scan CONFIG_DIR and build every instance. Blocking; call via asyncio.to_thread."""
+        instances: list[dict[str, Any]] = []
+        for name in _list_instance_names():
+            instance_data = self._build_instance_data(name)
+            if instance_data is not None:
+                instances.append(instance_data)
         return instances
 
+    async def get_instances(self) -> list[dict[str, Any]]:
+        """Get list of all proxy instances.
+
+        The directory scan, metadata and passwd reads run in a worker thread so
+        UI polling does not block the event loop.
+        """
+        return await asyncio.to_thread(self._collect_instances)
+
     def _save_desired_state(self, name: str, state: str) -> None:
-        """Persist the desired state (running/stopped) in instance.json."""
-        name = validate_instance_name(name)  # Sanitize before path construction
-        import json
+        """Persist the desired state (running/stopped) in instance.json.
 
+        Skips the rewrite when the stored state already matches, so repeated
+        starts/stops do not touch the file (or invalidate the metadata cache).
+        """
+        name = validate_instance_name(name)  # Sanitize before path construction
         metadata_file = _safe_path(CONFIG_DIR, name, "instance.json")
-        if not metadata_file.exists():
-            return
         try:
-            metadata = json.loads(metadata_file.read_text())
+            metadata = self._read_metadata(metadata_file)
+            if metadata is None or metadata.get("desired_state") == state:
+                return
             metadata["desired_state"] = state
-            metadata_file.write_text(json.dumps(metadata, indent=2))
+            self._write_metadata(metadata_file, metadata)
         except Exception as ex:
             _LOGGER.warning("Failed to save desired state for %s: %s", name, ex)
 
@@ -533,19 +666,11 @@ class ProxyInstanceManager:
         - Instances with desired_state 'running' are started if not already running.
         - Instances with desired_state 'stopped' are stopped if currently running.
         - Instances without desired_state default to 'running' for backward compat.
-        """
-        import json
 
-        if not CONFIG_DIR.exists():
-            return
-
-        for item in CONFIG_DIR.iterdir():
-            if not item.is_dir():
-                continue
-            try:
-                name = validate_instance_name(item.name)
-            except ValueError:
-                continue
+        Instances are independent, so they are restored concurrently.
+        """
+        names: list[str] = []
+        for name in _list_instance_names():
             instance_dir = _safe_path(CONFIG_DIR, name)
             if not (instance_dir / "instance.json").exists():
                 continue
@@ -553,50 +678,54 @@ class ProxyInstanceManager:
             has_config = (instance_dir / "squid.conf").exists() or (
                 instance_dir / "nginx_stream.conf"
             ).exists()
-            if not has_config:
-                continue
-            try:
-                metadata = json.loads((instance_dir / "instance.json").read_text())
-                desired = metadata.get("desired_state", "running")
-                is_running = name in self.processes and self.processes[name].poll() is None
-
-                if desired == "running" and not is_running:
-                    _LOGGER.info("Restoring desired state: starting instance %s", name)
-                    await self.start_instance(name)
-                elif desired == "stopped" and is_running:
-                    _LOGGER.info("Restoring desired state: stopping instance %s", name)
-                    await self.stop_instance(name)
-            except Exception as ex:
-                _LOGGER.warning("Failed to restore desired state for %s: %s", name, ex)
+            if has_config:
+                names.append(name)
+        await asyncio.gather(*(self._restore_desired_state(name) for name in names))
+
+    async def _restore_desired_state(self, name: str) -> None:
+        """Start or stop a single instance to match its saved desired_state."""
+        try:
+            metadata = self._read_metadata(_safe_path(CONFIG_DIR, name, "instance.json")) or {}
+            desired = metadata.get("desired_state", "running")
+            is_running = self._is_running(name)
+
+            if desired == "running" and not is_running:
+                _LOGGER.info("Restoring desired state: starting instance %s", name)
+                await self.start_instance(name)
+            elif desired == "stopped" and is_running:
+                _LOGGER.info("Restoring desired state: stopping instance %s", name)
+                await self.stop_instance(name)
+        except Exception as ex:
+            _LOGGER.warning("Failed to restore desired state for %s: %s", name, ex)
 
     def _get_proxy_type(self, name: str) -> str:
         """Read proxy_type from instance.json, defaulting to 'squid'."""
         name = validate_instance_name(name)
         name = os.path.basename(name)  # CodeQL path-injection sanitiser
-        import json
 
         # Security audit: name triple-validated (validate_instance_name + basename + _safe_path).
         metadata_file = _safe_path(CONFIG_DIR, name, "instance.json")
-        if metadata_file.exists():  # lgtm[py/path-injection]
-            try:
-                metadata = json.loads(metadata_file.read_text())  # lgtm[py/path-injection]
-                return str(metadata.get("proxy_type", "squid"))
-            except Exception:
-                _LOGGER.debug("Failed to read proxy_type for %s", name)
-        return "squid"
+        try:
+            metadata = self._read_metadata(metadata_file)  # lgtm[py/path-injection]
+        except Exception:
+            _LOGGER.debug("Failed to read proxy_type for %s", name)
+            return PROXY_TYPE_SQUID
+        if metadata is None:
+            return PROXY_TYPE_SQUID
+        return str(metadata.get("proxy_type", PROXY_TYPE_SQUID))
 
     async def start_instance(self, name: str) -> bool:
         """Start a proxy instance process."""
         name = validate_instance_name(name)
         name = os.path.basename(name)  # CodeQL path-injection sanitiser
-        if name in self.processes and self.processes[name].poll() is None:
+        if self._is_running(name):
             _LOGGER.info("Instance %s is already running", name)
             return True
 
         instance_dir = _safe_path(CONFIG_DIR, name)
         proxy_type = self._get_proxy_type(name)
 
-        if proxy_type == "tls_tunnel":
+        if proxy_type == PROXY_TYPE_TLS_TUNNEL:
             return await self._start_tls_tunnel_instance(name, instance_dir)
 
         return await self._start_squid_instance(name, instance_dir)
@@ -613,16 +742,10 @@ class ProxyInstanceManager:
             return False
 
         # Find nginx binary
-        import shutil as _shutil
-
-        actual_binary = NGINX_BINARY
-        if not os.path.exists(NGINX_BINARY):
-            found = _shutil.which("nginx")
-            if found:
-                actual_binary = found
-            else:
-                _LOGGER.error("nginx binary not found!")
-                return False
+        actual_binary = self._resolve_binary(NGINX_BINARY, "nginx")
+        if actual_binary is None:
+            _LOGGER.error("nginx binary not found!")
+            return False
 
         instance_logs_dir = _safe_path(LOGS_DIR, name)
         instance_logs_dir.mkdir(parents=True, exist_ok=True)  # lgtm[py/path-injection]
@@ -645,9 +768,7 @@ class ProxyInstanceManager:
 
             log_file_path = instance_logs_dir / "nginx_error.log"
             log_output = open(log_file_path, "a", buffering=1)  # lgtm[py/path-injection]
-            log_output.write(
-                f"\n--- Starting nginx at {__import__('datetime').datetime.now().isoformat()} ---\n"
-            )
+            log_output.write(f"\n--- Starting nginx at {datetime.now().isoformat()} ---\n")
             log_output.flush()
 
             process = subprocess.Popen(  # nosec B603  # lgtm[py/command-line-injection]
@@ -706,93 +827,79 @@ class ProxyInstanceManager:
             _maybe_chown(instance_cache_dir, uid, gid)
 
         # Check for Squid binary
-        if not os.path.exists(SQUID_BINARY):
-            _LOGGER.error("Squid binary not found at %s", SQUID_BINARY)
-            import shutil
-
-            found_squid = shutil.which("squid")
-            if found_squid:
-                _LOGGER.info("Found Squid at %s via PATH", found_squid)
-                actual_binary = found_squid
-            else:
-                _LOGGER.error("Squid binary not found anywhere!")
-                return False
-        else:
-            actual_binary = SQUID_BINARY
+        actual_binary = self._resolve_binary(SQUID_BINARY, "squid")
+        if actual_binary is None:
+            _LOGGER.error("Squid binary not found anywhere!")
+            return False
 
         # Handle HTTPS/SSL certificate verification
         metadata_file = instance_dir / "instance.json"
         if metadata_file.exists():
             try:
-                import json
-
-                metadata = json.loads(metadata_file.read_text())
+                metadata = self._read_metadata(metadata_file) or {}
                 if metadata.get("https_enabled"):
                     instance_cert_dir = _safe_path(CERTS_DIR, name)
                     cert_file = instance_cert_dir / "squid.crt"
                     key_file = instance_cert_dir / "squid.key"
 
-                    if not cert_file.exists() or not key_file.exists():
-                        raise RuntimeError(f"HTTPS enabled but certificates missing for {name}")
-
-                    # Fix permissions if needed
+                    # Fix permissions if needed (one stat per file doubles as existence check)
                     for cert_path in (cert_file, key_file):
-                        if cert_path.stat().st_mode & 0o777 != 0o640:
+                        try:
+                            mode = cert_path.stat().st_mode
+                        except FileNotFoundError:
+                            raise RuntimeError(
+                                f"HTTPS enabled but certificates missing for {name}"
+                            ) from None
+                        if mode & 0o777 != 0o640:
                             cert_path.chmod(0o640)
                         resolved = _resolve_effective_user_group()
                         if resolved:
                             uid, gid = resolved
                             _maybe_chown(cert_path, uid, gid)
 
-                    # Validate certificate
-                    try:
-                        import subprocess as sp  # nosec B404
-
-                        result = sp.run(  # nosec B603,B607
-                            ["openssl", "x509", "-in", str(cert_file), "-noout", "-text"],
-                            capture_output=True,
-                            text=True,
-                            timeout=5,
-                        )
-                        if result.returncode != 0:
-                            raise RuntimeError(
-                                f"Certificate validation failed for {name}: {result.stderr}"
-                            )
-                        _LOGGER.info("Certificate validated for %s", name)
-                    except FileNotFoundError:
-                        _LOGGER.warning("OpenSSL not found, skipping cert validation")
-
-                    # Verify readable
+                    # Read each file once: the cert read doubles as its readability
+                    # check and feeds in-process validation (no openssl fork).
                     # Security audit: cert_file/key_file from _safe_path(CERTS_DIR, name)
                     # + hardcoded literals "squid.crt"/"squid.key". Name validated by regex.
                     try:
-                        with open(cert_file) as fh:  # lgtm[py/path-injection]
-                            fh.read(1)
-                        with open(key_file) as fh:  # lgtm[py/path-injection]
+                        cert_data = cert_file.read_bytes()  # lgtm[py/path-injection]
+                        with open(key_file, "rb") as fh:  # lgtm[py/path-injection]
                             fh.read(1)
                     except Exception as ex:
                         raise RuntimeError(
                             f"Cannot read certificate files for {name}: {ex}"
                         ) from ex
+                    try:
+                        x509.load_pem_x509_certificate(cert_data)
+                    except ValueError as ex:
+                        raise RuntimeError(
+                            f"Certificate validation failed for {name}: {ex}"
+                        ) from ex
+                    _LOGGER.info("Certificate validated for %s", name)
 
                     _LOGGER.info("Verified HTTPS certificates for %s", name)
             except Exception as ex:
                 _LOGGER.error("Error during HTTPS certificate check for %s: %s", name, ex)
                 raise
 
-        # Initialize cache if needed
-        try:
-            subprocess.run(  # nosec B603
-                [actual_binary, "-z", "-f", str(config_file)],
-                check=True,
-                capture_output=True,
-            )
-        except subprocess.CalledProcessError as e:
-            _LOGGER.warning(
-                "Cache initialization returned non-zero for %s: %s", name, e.stderr.decode()
-            )
-        except Exception as ex:
-            _LOGGER.warning("Failed to run cache initialization for %s: %s", name, ex)
+        # Initialize cache if needed (can take seconds; run off the event loop).
+        # squid -z creates the ufs swap directories 00..0F; skip it once they exist.
+        if (instance_cache_dir / "00").is_dir():
+            _LOGGER.debug("Cache already initialized for %s", name)
+        else:
+            try:
+                await asyncio.to_thread(
+                    subprocess.run,  # nosec B603
+                    [actual_binary, "-z", "-f", str(config_file)],
+                    check=True,
+                    capture_output=True,
+                )
+            except subprocess.CalledProcessError as e:
+                _LOGGER.warning(
+                    "Cache initialization returned non-zero for %s: %s", name, e.stderr.decode()
+                )
+            except Exception as ex:
+                _LOGGER.warning("Failed to run cache initialization for %s: %s", name, ex)
 
         try:
             cmd = [actual_binary, "-N", "-f", str(config_file)]
@@ -800,9 +907,7 @@ class ProxyInstanceManager:
 
             log_file_path = instance_logs_dir / "cache.log"
             log_output = open(log_file_path, "a", buffering=1)  # lgtm[py/path-injection]
-            log_output.write(
-                f"\n--- Starting Squid at {__import__('datetime').datetime.now().isoformat()} ---\n"
-            )
+            log_output.write(f"\n--- Starting Squid at {datetime.now().isoformat()} ---\n")
             log_output.write(f"Command: {' '.join(cmd)}\n")
             log_output.flush()
 
@@ -831,15 +936,15 @@ class ProxyInstanceManager:
 
     async def stop_instance(self, name: str) -> bool:
         """Stop a proxy instance process."""
-        if name not in self.processes:
+        process = self.processes.get(name)
+        if process is None:
             _LOGGER.warning("No process found for instance %s", name)
             self._save_desired_state(name, "stopped")
             return True
 
-        process = self.processes[name]
         if process.poll() is not None:
             _LOGGER.info("Instance %s is already stopped", name)
-            del self.processes[name]
+            self.processes.pop(name, None)
             self._save_desired_state(name, "stopped")
             return True
 
@@ -848,69 +953,46 @@ class ProxyInstanceManager:
         try:
             _LOGGER.info("Stopping %s process for %s (PID: %d)", proxy_type, name, process.pid)
 
-            if proxy_type == "tls_tunnel":
-                # nginx: SIGQUIT for graceful shutdown, then SIGTERM
-                try:
-                    os.killpg(os.getpgid(process.pid), signal.SIGQUIT)
-                except ProcessLookupError:
-                    pass
-            else:
-                # Squid: SIGTERM to the process group
-                try:
-                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-                except ProcessLookupError:
-                    pass  # Already dead
-
-            # Wait for process to terminate
-            stopped = False
-            for _ in range(10):
-                if process.poll() is not None:
-                    stopped = True
-                    break
-                await asyncio.sleep(0.5)
+            stop_signal = STOP_SIGNALS.get(proxy_type, signal.SIGTERM)
+            try:
+                os.killpg(os.getpgid(process.pid), stop_signal)
+            except ProcessLookupError:
+                pass  # Already dead
 
-            if not stopped:
+            # Wait for process to terminate (blocking wait in a thread, no polling)
+            if not await _wait_for_exit(process, STOP_TIMEOUT):
                 _LOGGER.warning("Process %d didn't stop, sending SIGKILL", process.pid)
                 try:
                     os.killpg(os.getpgid(process.pid), signal.SIGKILL)
                 except ProcessLookupError:
                     pass  # Already dead
 
-            # Reap the zombie and ensure the process is fully gone
-            for _ in range(10):
-                if process.poll() is not None:
-                    break
-                await asyncio.sleep(0.3)
-            # Final synchronous reap (non-blocking since process should be dead)
-            try:
-                process.wait(timeout=0)
-            except subprocess.TimeoutExpired:
-                _LOGGER.debug("Process %s still alive after reap attempt", name)
+                # Reap the zombie and ensure the process is fully gone
+                if not await _wait_for_exit(process, KILL_REAP_TIMEOUT):
+                    _LOGGER.debug("Process %s still alive after reap attempt", name)
 
-            if name in self.processes:
-                del self.processes[name]
-            if name in self._log_handles:
-                try:
-                    self._log_handles.pop(name).close()
-                except Exception:  # nosec B110 — best-effort cleanup
-                    _LOGGER.debug("Failed to close log handle for %s", name)
+            self._forget_process(name)
             _LOGGER.info("Process stopped for %s", name)
             self._save_desired_state(name, "stopped")
             return True
         except Exception as ex:
             _LOGGER.error("Failed to stop process for %s: %s", name, ex)
             # Clean up the process entry even on failure
-            if name in self.processes:
-                del self.processes[name]
-            if name in self._log_handles:
-                try:
-                    self._log_handles.pop(name).close()
-                except Exception:  # nosec B110 — best-effort cleanup
-                    _LOGGER.debug("Failed to close log handle for %s", name)
+            self._forget_process(name)
             # Save desired_state even on failure to prevent auto-restart on addon restart
             self._save_desired_state(name, "stopped")
             return False
 
+    def _forget_process(self, name: str) -> None:
+        """Drop the tracked process for ``name`` and close its log handle."""
+        self.processes.pop(name, None)
+        log_handle = self._log_handles.pop(name, None)
+        if log_handle is not None:
+            try:
+                log_handle.close()
+            except Exception:  # nosec B110 — best-effort cleanup
+                _LOGGER.debug("Failed to close log handle for %s", name)
+
     async def remove_instance(self, name: str) -> bool:
         """Remove a proxy instance and its configuration."""
         name = validate_instance_name(name)
@@ -919,16 +1001,11 @@ class ProxyInstanceManager:
         if not stopped:
             _LOGGER.warning("Failed to stop instance %s, attempting removal anyway", name)
 
-        # Wait a bit for process to fully terminate
-        await asyncio.sleep(1)
-
         instance_dir = _safe_path(CONFIG_DIR, name)
         instance_logs_dir = _safe_path(LOGS_DIR, name)
         instance_cert_dir = _safe_path(CERTS_DIR, name)
 
         try:
-            import shutil
-
             # Remove all instance directories
             for directory in [instance_dir, instance_logs_dir, instance_cert_dir]:
                 if directory.exists():
@@ -936,8 +1013,8 @@ class ProxyInstanceManager:
                     _LOGGER.debug("Removed directory: %s", directory)
 
             # Clean up process entry if still present
-            if name in self.processes:
-                del self.processes[name]
+            self.processes.pop(name, None)
+            self._auth_managers.pop(name, None)
 
             _LOGGER.info("✓ Instance %s removed", name)
             return True
@@ -948,17 +1025,9 @@ class ProxyInstanceManager:
     async def get_users(self, name: str) -> list[str]:
         """Get list of users for an instance."""
         name = validate_instance_name(name)
-        instance_dir = _safe_path(CONFIG_DIR, name)
-        passwd_file = instance_dir / "passwd"
-
-        if not passwd_file.exists():
-            return []
-
         try:
-            from auth_manager import AuthManager
-
-            auth_manager = AuthManager(passwd_file)
-            return auth_manager.get_users()
+            # A missing passwd file yields an empty list
+            return await asyncio.to_thread(self._get_auth_manager(name).get_users)
         except Exception as ex:
             _LOGGER.error("Failed to list users for %s: %s", name, ex)
             return []
@@ -966,49 +1035,18 @@ class ProxyInstanceManager:
     async def add_user(self, name: str, username: str, password: str) -> bool:
         """Add a user to an instance."""
         name = validate_instance_name(name)
-        instance_dir = _safe_path(CONFIG_DIR, name)
-        passwd_file = instance_dir / "passwd"
-
         try:
-            from auth_manager import AuthManager
-
-            auth_manager = AuthManager(passwd_file)
-            if not auth_manager.add_user(username, password):
+            auth_manager = self._get_auth_manager(name)
+            # apr1 hashing is ~1000 MD5 rounds of pure-Python CPU work; keep it off the loop
+            if not await asyncio.to_thread(auth_manager.add_user, username, password):
                 raise ValueError(f"User {username} already exists")
 
-            # Ensure password file is written and has correct permissions
-
-            if passwd_file.exists():
-                passwd_file.chmod(0o640)
-                resolved = _resolve_effective_user_group()
-                if resolved:
-                    uid, gid = resolved
-                    _maybe_chown(passwd_file, uid, gid)
-                # Verify file was written by checking it's not empty (if users exist)
-                if passwd_file.stat().st_size == 0 and auth_manager.get_user_count() > 0:
-                    _LOGGER.warning("Password file appears empty after adding user, retrying save")
-                    auth_manager._save_users()
+            # Ensure password file has correct permissions and ownership
+            await asyncio.to_thread(_prepare_passwd_file, auth_manager, None)
 
             _LOGGER.info("✓ Added user %s to instance %s", username, name)
 
-            # Restart if running to apply changes - with better error handling
-            if name in self.processes:
-                stopped = await self.stop_instance(name)
-                if not stopped:
-                    _LOGGER.error("Failed to stop instance %s for user update", name)
-                    return False
-                # Wait for process to fully stop
-                await asyncio.sleep(1)
-
-                started = await self.start_instance(name)
-                if not started:
-                    _LOGGER.error("Failed to restart instance %s after user update", name)
-                    return False
-                # Wait for Squid to fully start and load auth
-                await asyncio.sleep(2)
-                _LOGGER.info("Instance %s restarted successfully with new user", name)
-
-            return True
+            return await self._restart_for_user_change(name)
         except ValueError:
             # Re-raise validation errors to be handled by the API
             raise
@@ -1019,49 +1057,102 @@ class ProxyInstanceManager:
     async def remove_user(self, name: str, username: str) -> bool:
         """Remove a user from an instance."""
         name = validate_instance_name(name)
-        instance_dir = _safe_path(CONFIG_DIR, name)
-        passwd_file = instance_dir / "passwd"
-
         try:
-            from auth_manager import AuthManager
-
-            auth_manager = AuthManager(passwd_file)
-            if not auth_manager.remove_user(username):
+            auth_manager = self._get_auth_manager(name)
+            if not await asyncio.to_thread(auth_manager.remove_user, username):
                 _LOGGER.warning("User %s does not exist in instance %s", username, name)
                 return False
 
-            # Ensure password file is written
-            if passwd_file.exists():
-                passwd_file.chmod(0o640)
-                resolved = _resolve_effective_user_group()
-                if resolved:
-                    uid, gid = resolved
-                    _maybe_chown(passwd_file, uid, gid)
+            # Ensure password file has correct permissions and ownership
+            await asyncio.to_thread(_prepare_passwd_file, auth_manager, None)
 
             _LOGGER.info("✓ Removed user %s from instance %s", username, name)
 
-            # Restart if running to apply changes - with better error handling
-            if name in self.processes:
-                stopped = await self.stop_instance(name)
-                if not stopped:
-                    _LOGGER.error("Failed to stop instance %s for user removal", name)
-                    return False
-                # Wait for process to fully stop
-                await asyncio.sleep(1)
-
-                started = await self.start_instance(name)
-                if not started:
-                    _LOGGER.error("Failed to restart instance %s after user removal", name)
-                    return False
-                # Wait for Squid to fully start and load auth
-                await asyncio.sleep(2)
-                _LOGGER.info("Instance %s restarted successfully after user removal", name)
-
-            return True
+            return await self._restart_for_user_change(name)
         except Exception as ex:
             _LOGGER.error("Failed to remove user from %s: %s", name, ex)
             return False
 
+    async def add_users(self, name: str, users: list[dict[str, str]]) -> list[str]:
+        """Add several users to an instance with one passwd rewrite and one restart.
+
+        Invalid or duplicate entries are skipped (see ``AuthManager.add_users``).
+
+        Returns:
+            List of usernames that were added
+
+        Raises:
+            RuntimeError: If the instance could not be restarted to apply the change
+        """
+        name = validate_instance_name(name)
+        auth_manager = self._get_auth_manager(name)
+        added = await asyncio.to_thread(_prepare_passwd_file, auth_manager, users)
+        if added:
+            _LOGGER.info("✓ Added %d user(s) to instance %s", len(added), name)
+            if not await self._restart_for_user_change(name):
+                raise RuntimeError(f"Failed to restart instance {name} after user update")
+        return added
+
+    async def remove_users(self, name: str, usernames: list[str]) -> list[str]:
+        """Remove several users from an instance with one passwd rewrite and one restart.
+
+        Unknown usernames are skipped.
+
+        Returns:
+            List of usernames that were removed
+
+        Raises:
+            RuntimeError: If the instance could not be restarted to apply the change
+        """
+        name = validate_instance_name(name)
+        auth_manager = self._get_auth_manager(name)
+        removed = await asyncio.to_thread(auth_manager.remove_users, usernames)
+        if removed:
+            await asyncio.to_thread(_prepare_passwd_file, auth_manager, None)
+            _LOGGER.info("✓ Removed %d user(s) from instance %s", len(removed), name)
+            if not await self._restart_for_user_change(name):
+                raise RuntimeError(f"Failed to restart instance {name} after user removal")
+        return removed
+
+    async def _restart_for_user_change(self, name: str) -> bool:
+        """Restart a running instance so Squid reloads the passwd file.
+
+        Concurrent user changes share a restart that has not begun yet, so a
+        burst of changes costs one restart instead of one each. Changes made
+        after a restart has begun queue a fresh one.
+
+        Returns True if the instance is not running or restarted successfully.
+        """
+        if name not in self.processes:
+            return True
+
+        pending = self._pending_restarts.get(name)
+        if pending is None:
+            pending = asyncio.ensure_future(self._run_user_change_restart(name))
+            self._pending_restarts[name] = pending
+        # Shield so one cancelled caller does not cancel the restart for the others
+        return await asyncio.shield(pending)
+
+    async def _run_user_change_restart(self, name: str) -> bool:
+        """Perform a coalesced user-change restart, one at a time per instance."""
+        lock = self._restart_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            # From here on the passwd file is re-read, later changes need a new restart
+            self._pending_restarts.pop(name, None)
+            if name not in self.processes:
+                return True
+
+            if not await self.stop_instance(name):
+                _LOGGER.error("Failed to stop instance %s for user update", name)
+                return False
+            if not await self.start_instance(name):
+                _LOGGER.error("Failed to restart instance %s after user update", name)
+                return False
+            # Wait for Squid to fully start and load auth
+            await asyncio.sleep(2)
+            _LOGGER.info("Instance %s restarted successfully with updated users", name)
+            return True
+
     async def update_instance(
         self,
         name: str,
@@ -1080,25 +1171,24 @@ class ProxyInstanceManager:
             return False
 
         try:
-            import json
-
             metadata_file = instance_dir / "instance.json"
-            if not metadata_file.exists():
+            loaded = self._read_metadata(metadata_file)
+            if loaded is None:
                 current_port = 3128
                 current_https = False
-                proxy_type = "squid"
-                metadata = {}
+                proxy_type = PROXY_TYPE_SQUID
+                metadata: dict[str, Any] = {}
             else:
-                metadata = json.loads(metadata_file.read_text())
+                metadata = loaded
                 current_port = metadata.get("port", 3128)
                 current_https = metadata.get("https_enabled", False)
                 # Backward compatibility: read but ignore dpi_prevention from old instance.json
-                proxy_type = metadata.get("proxy_type", "squid")
+                proxy_type = metadata.get("proxy_type", PROXY_TYPE_SQUID)
 
             new_port = port if port is not None else current_port
             validate_port(new_port)
 
-            if proxy_type == "tls_tunnel":
+            if proxy_type == PROXY_TYPE_TLS_TUNNEL:
                 return await self._update_tls_tunnel_instance(
                     name,
                     new_port,
@@ -1117,10 +1207,10 @@ class ProxyInstanceManager:
             metadata.update(
                 {
                     "name": name,
-                    "proxy_type": "squid",
+                    "proxy_type": PROXY_TYPE_SQUID,
                     "port": new_port,
                     "https_enabled": new_https,
-                    "updated_at": __import__("datetime").datetime.now().isoformat(),
+                    "updated_at": datetime.now().isoformat(),
                 }
             )
 
@@ -1128,11 +1218,9 @@ class ProxyInstanceManager:
             if external_ip is not None:
                 metadata["external_ip"] = external_ip
 
-            metadata_file.write_text(json.dumps(metadata, indent=2))
+            self._write_metadata(metadata_file, metadata)
 
             # Regenerate Squid configuration
-            from squid_config import SquidConfigGenerator
-
             config_gen = SquidConfigGenerator(name, new_port, new_https, str(CONFIG_DIR))
             config_file = instance_dir / "squid.conf"
             config_gen.generate_config(config_file)
@@ -1143,44 +1231,7 @@ class ProxyInstanceManager:
 
             # Handle HTTPS certificate
             if new_https:
-                from cert_manager import CertificateManager
-
-                instance_cert_dir = _safe_path(CERTS_DIR, name)
-                if instance_cert_dir.exists():
-                    import shutil
-
-                    shutil.rmtree(instance_cert_dir, ignore_errors=True)
-
-                instance_cert_dir.mkdir(parents=True, exist_ok=True)
-                instance_cert_dir.chmod(0o750)
-                resolved = _resolve_effective_user_group()
-                if resolved:
-                    uid, gid = resolved
-                    _maybe_chown(instance_cert_dir, uid, gid)
-
-                cert_manager = CertificateManager(CERTS_DIR, name)
-                cert_params = cert_params or {}
-                cert_file, key_file = await cert_manager.generate_certificate(
-                    validity_days=cert_params.get("validity_days", 365),
-                    key_size=cert_params.get("key_size", 2048),
-                    common_name=cert_params.get("common_name"),
-                    country=cert_params.get("country", "US"),
-                    organization=cert_params.get("organization", "Squid Proxy Manager"),
-                )
-
-                await asyncio.sleep(0.5)
-                if not cert_file.exists() or not key_file.exists():
-                    raise RuntimeError(f"Failed to generate certificates for {name}")
-                if cert_file.stat().st_size == 0 or key_file.stat().st_size == 0:
-                    raise RuntimeError(f"Generated certificates for {name} are empty")
-
-                try:
-                    from cryptography import x509
-
-                    x509.load_pem_x509_certificate(cert_file.read_bytes())
-                except Exception as ex:
-                    raise RuntimeError(f"Generated certificate for {name} is invalid: {ex}") from ex
-
+                await self._generate_instance_cert(name, cert_params)
                 _LOGGER.info("Generated HTTPS certificates for instance %s", name)
 
             _LOGGER.info("Updated configuration for instance %s", name)
@@ -1190,7 +1241,6 @@ class ProxyInstanceManager:
                 stopped = await self.stop_instance(name)
                 if not stopped:
                     _LOGGER.warning("Failed to stop instance %s before restart", name)
-                await asyncio.sleep(1)
                 started = await self.start_instance(name)
                 if not started:
                     raise RuntimeError(f"Failed to restart instance {name} after update")
@@ -1215,8 +1265,6 @@ class ProxyInstanceManager:
         """Update a TLS tunnel instance configuration."""
         name = validate_instance_name(name)
         name = os.path.basename(name)  # CodeQL path-injection sanitiser
-        import json
-
         current_forward = metadata.get("forward_address", "")
         current_cover = metadata.get("cover_domain", "")
         current_rate_limit = metadata.get("rate_limit", 10)
@@ -1229,8 +1277,6 @@ class ProxyInstanceManager:
         if not new_forward:
             raise ValueError("forward_address cannot be empty for TLS tunnel instances")
 
-        from tls_tunnel_config import normalize_forward_address, validate_forward_address
-
         validate_forward_address(new_forward)
         # Normalize to always include port (defaults to 443)
         new_forward = normalize_forward_address(new_forward)
@@ -1242,7 +1288,7 @@ class ProxyInstanceManager:
                 "forward_address": new_forward,
                 "cover_domain": new_cover,
                 "rate_limit": new_rate_limit,
-                "updated_at": __import__("datetime").datetime.now().isoformat(),
+                "updated_at": datetime.now().isoformat(),
             }
         )
 
@@ -1252,11 +1298,9 @@ class ProxyInstanceManager:
 
         # Security audit: instance_dir from _safe_path() in caller update_instance()
         metadata_file = instance_dir / "instance.json"
-        metadata_file.write_text(json.dumps(metadata, indent=2))  # lgtm[py/path-injection]
+        self._write_metadata(metadata_file, metadata)
 
         # Regenerate nginx configs
-        from tls_tunnel_config import TlsTunnelConfigGenerator
-
         config_gen = TlsTunnelConfigGenerator(
             instance_name=name,
             listen_port=new_port,
@@ -1289,7 +1333,6 @@ class ProxyInstanceManager:
             stopped = await self.stop_instance(name)
             if not stopped:
                 _LOGGER.warning("Failed to stop instance %s before restart", name)
-            await asyncio.sleep(1)
             started = await self.start_instance(name)
             if not started:
                 raise RuntimeError(f"Failed to restart instance {name} after update")
@@ -1304,44 +1347,8 @@ class ProxyInstanceManager:
             return False
 
         try:
-            # Remove old certificates
-            instance_cert_dir = _safe_path(CERTS_DIR, name)
-            if instance_cert_dir.exists():
-                import shutil
-
-                shutil.rmtree(instance_cert_dir, ignore_errors=True)
-
-            instance_cert_dir.mkdir(parents=True, exist_ok=True)
-            instance_cert_dir.chmod(0o750)
-            resolved = _resolve_effective_user_group()
-            if resolved:
-                uid, gid = resolved
-                _maybe_chown(instance_cert_dir, uid, gid)
-
-            from cert_manager import CertificateManager
-
-            cert_manager = CertificateManager(CERTS_DIR, name)
-            cert_params = cert_params or {}
-            cert_file, key_file = await cert_manager.generate_certificate(
-                validity_days=cert_params.get("validity_days", 365),
-                key_size=cert_params.get("key_size", 2048),
-                common_name=cert_params.get("common_name"),
-                country=cert_params.get("country", "US"),
-                organization=cert_params.get("organization", "Squid Proxy Manager"),
-            )
-
-            # Verify certificates
-            if not cert_file.exists() or not key_file.exists():
-                raise RuntimeError(f"Failed to generate certificates for {name}")
-
-            # Verify certificate can be loaded
-            try:
-                from cryptography import x509
-
-                cert_data = cert_file.read_bytes()
-                x509.load_pem_x509_certificate(cert_data)
-            except Exception as ex:
-                raise RuntimeError(f"Generated certificate for {name} is invalid: {ex}") from ex
+            # Replace old certificates and verify the new pair
+            await self._generate_instance_cert(name, cert_params)
             _LOGGER.info("✓ Regenerated certificates for instance %s", name)
 
             # Restart if running to apply changes (robust stop/start)
@@ -1349,8 +1356,6 @@ class ProxyInstanceManager:
                 stopped = await self.stop_instance(name)
                 if not stopped:
                     _LOGGER.warning("Failed to stop instance %s before restart", name)
-                # Wait for process to fully stop
-                await asyncio.sleep(1)
                 started = await self.start_instance(name)
                 if not started:
                     raise RuntimeError(f"Failed to restart instance {name} after cert regeneration")
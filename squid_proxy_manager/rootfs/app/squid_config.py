@@ -1,5 +1,6 @@
 """Dynamic Squid configuration generation."""
 
+import functools
 import grp
 import logging
 import os
@@ -7,11 +8,77 @@ import pwd
 import shlex
 from pathlib import Path
 
+from file_utils import PERM_CONFIG_FILE, write_file
+
 _LOGGER = logging.getLogger(__name__)
 
 # Default container paths (can be overridden for testing)
 DEFAULT_DATA_DIR = "/data/squid_proxy_manager"
 
+# Private/link-local networks for the localnet ACL
+LOCALNET_CIDRS = ("10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16", "fc00::/7", "fe80::/10")
+_LOCALNET_ACL_LINES = tuple(f"acl localnet src {cidr}" for cidr in LOCALNET_CIDRS)
+
+# Instance-independent trailing section of every config
+_STATIC_TAIL_LINES = (
+    "# Security hardening",
+    "via off",
+    "forwarded_for delete",
+    "request_header_access X-Forwarded-For deny all",
+    "request_header_access Via deny all",
+    "request_header_access Cache-Control deny all",
+    "",
+    "# Disable unnecessary features",
+    "cache deny all",
+    "",
+    "# Error pages",
+    "error_directory /usr/share/squid/errors/en",
+    "",
+)
+
+
+# Unprivileged accounts Squid runs as when the add-on runs as root, in preference order
+SQUID_USER_CANDIDATES = ("proxy", "squid", "nobody")
+
+
+@functools.lru_cache(maxsize=1)
+def resolve_squid_account() -> tuple[str, str, int, int] | None:
+    """Return ``(user, group, uid, gid)`` of the account Squid runs as.
+
+    As root, the first existing candidate account is used, falling back to the
+    current user; otherwise Squid runs as the current user. The uid and account
+    database do not change while the add-on runs, so this is resolved once.
+    Returns None if the account cannot be resolved.
+    """
+    try:
+        if os.getuid() == 0:
+            for candidate in SQUID_USER_CANDIDATES:
+                try:
+                    user = pwd.getpwnam(candidate)
+                except KeyError:
+                    continue
+                group = grp.getgrgid(user.pw_gid)
+                return user.pw_name, group.gr_name, user.pw_uid, group.gr_gid
+        user = pwd.getpwuid(os.getuid())
+        group = grp.getgrgid(os.getgid())
+        return user.pw_name, group.gr_name, user.pw_uid, group.gr_gid
+    except KeyError:
+        _LOGGER.warning("Unable to resolve effective user/group for squid config")
+        return None
+
+
+def _effective_user_group_lines() -> tuple[str, ...]:
+    """Return the cache_effective_user/group lines for this process."""
+    account = resolve_squid_account()
+    if account is None:
+        return ()
+    user, group, _, _ = account
+    return (
+        f"cache_effective_user {user}",
+        f"cache_effective_group {group}",
+        "",
+    )
+
 
 class SquidConfigGenerator:
     """Generates Squid configuration files."""
@@ -36,11 +103,17 @@ class SquidConfigGenerator:
         self.https_enabled = https_enabled
         self.data_dir = data_dir
 
-    def generate_config(self, config_file: Path) -> None:
+    def generate_config(self, config_file: Path) -> bool:
         """Generate Squid configuration file.
 
+        The file is only rewritten when the rendered content differs from
+        what is already on disk.
+
         Args:
             config_file: Path to write the configuration file
+
+        Returns:
+            True if the file was written, False if it was already up to date
         """
         # Calculate instance-specific paths using configurable data_dir
         instance_log_dir = f"{self.data_dir}/logs/{self.instance_name}"
@@ -56,33 +129,7 @@ class SquidConfigGenerator:
         ]
 
         # Ensure Squid runs as a non-root user to match file ownership/permissions
-        try:
-            if os.getuid() == 0:
-                chosen_user = None
-                for candidate in ("proxy", "squid", "nobody"):
-                    try:
-                        pwd.getpwnam(candidate)
-                        chosen_user = candidate
-                        break
-                    except KeyError:
-                        continue
-                if chosen_user:
-                    chosen_group = grp.getgrgid(pwd.getpwnam(chosen_user).pw_gid).gr_name
-                else:
-                    chosen_user = pwd.getpwuid(os.getuid()).pw_name
-                    chosen_group = grp.getgrgid(os.getgid()).gr_name
-            else:
-                chosen_user = pwd.getpwuid(os.getuid()).pw_name
-                chosen_group = grp.getgrgid(os.getgid()).gr_name
-            config_lines.extend(
-                [
-                    f"cache_effective_user {chosen_user}",
-                    f"cache_effective_group {chosen_group}",
-                    "",
-                ]
-            )
-        except KeyError:
-            _LOGGER.warning("Unable to resolve effective user/group for squid config")
+        config_lines.extend(_effective_user_group_lines())
 
         # If HTTPS is enabled, we use https_port instead of http_port on that port
         if self.https_enabled:
@@ -99,15 +146,10 @@ class SquidConfigGenerator:
         else:
             config_lines.append(f"http_port {self.port}")
 
+        config_lines.extend(["", "# Access control"])
+        config_lines.extend(_LOCALNET_ACL_LINES)
         config_lines.extend(
             [
-                "",
-                "# Access control",
-                "acl localnet src 10.0.0.0/8",
-                "acl localnet src 172.16.0.0/12",
-                "acl localnet src 192.168.0.0/16",
-                "acl localnet src fc00::/7",
-                "acl localnet src fe80::/10",
                 "",
                 "# Authentication",
                 f"auth_param basic program /usr/lib/squid/basic_ncsa_auth {instance_data_dir}/passwd",
@@ -132,31 +174,23 @@ class SquidConfigGenerator:
                 "cache_mem 64 MB",
                 "maximum_object_size_in_memory 512 KB",
                 "",
-                "# Security hardening",
-                "via off",
-                "forwarded_for delete",
-                "request_header_access X-Forwarded-For deny all",
-                "request_header_access Via deny all",
-                "request_header_access Cache-Control deny all",
-                "",
-                "# Disable unnecessary features",
-                "cache deny all",
-                "",
-            ]
-        )
-
-        config_lines.extend(
-            [
-                "# Error pages",
-                "error_directory /usr/share/squid/errors/en",
-                "",
             ]
         )
+        config_lines.extend(_STATIC_TAIL_LINES)
 
         config_content = "\n".join(config_lines)
-        config_file.write_text(config_content, encoding="utf-8")
-        config_file.chmod(0o640)
+        try:
+            unchanged = config_file.read_text(encoding="utf-8") == config_content
+        except (FileNotFoundError, UnicodeDecodeError):
+            unchanged = False
+        if unchanged:
+            config_file.chmod(PERM_CONFIG_FILE)
+            _LOGGER.debug("Squid configuration for %s is unchanged", self.instance_name)
+            return False
+
+        write_file(config_file, config_content)
 
         _LOGGER.info(
             "Generated Squid configuration for %s on port %d", self.instance_name, self.port
         )
+        return True
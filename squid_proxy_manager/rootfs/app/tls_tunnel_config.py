@@ -7,6 +7,8 @@ import logging
 import re
 from pathlib import Path
 
+from file_utils import write_file
+
 _LOGGER = logging.getLogger(__name__)
 
 DEFAULT_DATA_DIR = "/data/squid_proxy_manager"
@@ -18,6 +20,9 @@ INSTANCE_NAME_RE = re.compile(r"^[a-zA-Z0-9_-]{1,64}$")
 # Port is optional - defaults to 443 if not specified
 FORWARD_ADDRESS_RE = re.compile(r"^[a-zA-Z0-9._-]+(:\d{1,5})?$")
 
+# Characters not allowed in nginx config identifiers (upstream/map names)
+NGINX_IDENT_UNSAFE_RE = re.compile(r"[^a-zA-Z0-9_]")
+
 
 def normalize_forward_address(address: str) -> str:
     """Normalize forward_address to always include port.
@@ -101,7 +106,7 @@ class TlsTunnelConfigGenerator:
         _inst = _os.path.basename(self.instance_name)  # CodeQL path-injection sanitiser
 
         # Sanitize instance name for use in nginx config identifiers
-        safe_name = re.sub(r"[^a-zA-Z0-9_]", "_", _inst)
+        safe_name = NGINX_IDENT_UNSAFE_RE.sub("_", _inst)
 
         # Instance-local pid path (app user cannot write to /run/nginx/)
         instance_dir = Path(self.data_dir) / _inst
@@ -163,8 +168,7 @@ stream {{
         # Security audit: config_file from caller's _safe_path(CONFIG_DIR, name) + literal suffix.
         # instance_name validated by os.path.basename() + regex ^[a-z0-9][a-z0-9._-]{0,63}$.
         # CodeQL cannot follow taint through constructor validation or _safe_path().
-        config_file.write_text(config, encoding="utf-8")  # lgtm[py/path-injection]
-        config_file.chmod(0o640)  # lgtm[py/path-injection]
+        write_file(config_file, config)  # lgtm[py/path-injection]
         _LOGGER.info(
             "Generated nginx stream config for %s on port %d → %s",
             self.instance_name,
@@ -236,8 +240,7 @@ http {{
     }}
 }}
 """
-        config_file.write_text(config, encoding="utf-8")  # lgtm[py/path-injection]
-        config_file.chmod(0o640)  # lgtm[py/path-injection]
+        write_file(config_file, config)  # lgtm[py/path-injection]
         _LOGGER.info(
             "Generated cover site config for %s on 127.0.0.1:%d",
             self.instance_name,
@@ -48,30 +48,38 @@ async def test_proxy_type_badges_visible(browser, unique_name, unique_port, api_
         await page.goto(ADDON_URL)
         await page.wait_for_selector(f'[data-testid="instance-card-{squid_name}"]', timeout=30000)
 
-        # Check Squid badge
         squid_badge = page.locator(f'[data-testid="instance-type-badge-{squid_name}"]')
-        assert await squid_badge.count() > 0, "Squid badge should be visible"
-        squid_text = await squid_badge.inner_text()
+        tls_badge = page.locator(f'[data-testid="instance-type-badge-{tls_name}"]')
+        squid_count, tls_count = await asyncio.gather(squid_badge.count(), tls_badge.count())
+        assert squid_count > 0, "Squid badge should be visible"
+        assert tls_count > 0, "TLS Tunnel badge should be visible"
+
+        # Read text and background of both badges concurrently, one round-trip each
+        badge_info = "el => ({text: el.innerText, bg: getComputedStyle(el).backgroundColor})"
+        squid_info, tls_info = await asyncio.gather(
+            squid_badge.evaluate(badge_info), tls_badge.evaluate(badge_info)
+        )
+
+        # Check Squid badge
+        squid_text = squid_info["text"]
         assert (
             "Squid Proxy" in squid_text
         ), f"Squid badge should say 'Squid Proxy', got: {squid_text}"
 
         # Check Squid badge color (blue)
-        squid_bg = await squid_badge.evaluate("el => getComputedStyle(el).backgroundColor")
+        squid_bg = squid_info["bg"]
         assert (
             "3, 169, 244" in squid_bg or "rgb(3, 169, 244)" in squid_bg
         ), f"Squid badge should have blue background, got: {squid_bg}"
 
         # Check TLS Tunnel badge
-        tls_badge = page.locator(f'[data-testid="instance-type-badge-{tls_name}"]')
-        assert await tls_badge.count() > 0, "TLS Tunnel badge should be visible"
-        tls_text = await tls_badge.inner_text()
+        tls_text = tls_info["text"]
         assert (
             "TLS Tunnel" in tls_text
         ), f"TLS Tunnel badge should say 'TLS Tunnel', got: {tls_text}"
 
         # Check TLS Tunnel badge color (green)
-        tls_bg = await tls_badge.evaluate("el => getComputedStyle(el).backgroundColor")
+        tls_bg = tls_info["bg"]
         assert (
             "76, 175, 80" in tls_bg or "rgb(76, 175, 80)" in tls_bg
         ), f"TLS Tunnel badge should have green background, got: {tls_bg}"
@@ -126,7 +134,7 @@ async def test_tls_tunnel_routing_diagram_visible(browser, unique_name, unique_p
 
         # Select TLS Tunnel
         await page.click('[data-testid="proxy-type-tls-tunnel"]')
-        await asyncio.sleep(0.5)
+        await page.wait_for_selector("text=How TLS Tunnel Works", timeout=5000)
 
         # Check for routing diagram text
         page_text = await page.inner_text("body")
@@ -156,7 +164,7 @@ async def test_tls_tunnel_field_labels(browser, unique_name, unique_port):
 
         # Select TLS Tunnel
         await page.click('[data-testid="proxy-type-tls-tunnel"]')
-        await asyncio.sleep(0.5)
+        await page.wait_for_selector("text=Cover Domain", timeout=5000)
 
         # Check for improved labels
         page_text = await page.inner_text("body")
@@ -197,7 +205,8 @@ async def test_tls_tunnel_test_tab_exists(browser, unique_name, unique_port, api
 
         # Click Test tab
         await page.click("text=Test")
-        await asyncio.sleep(1)
+        # "Cover Site" text is already on the page; this button only renders in the Test tab
+        await page.wait_for_selector('[data-testid="test-vpn-forwarding-button"]', timeout=5000)
 
         # Check for test buttons
         page_text = await page.inner_text("body")
@@ -241,7 +250,8 @@ async def test_tls_tunnel_nginx_logs_tab(browser, unique_name, unique_port, api_
 
         # Click Logs tab
         await page.click("text=Logs")
-        await asyncio.sleep(1)
+        # The log type switcher only exists inside the Logs section
+        await page.wait_for_selector("text=Nginx Logs", timeout=5000)
 
         # Check for nginx logs
         page_text = await page.inner_text("body")
@@ -313,10 +313,11 @@ async def test_https_delete_instance(browser, unique_name, unique_port, api_sess
         # After delete, the app navigates to the dashboard.
         # Wait for navigation to complete by checking URL
         await page.wait_for_url(f"{ADDON_URL}/", timeout=60000)
-        await asyncio.sleep(1)  # Let dashboard render
 
         # Verify the instance card is gone from the dashboard
-        # (No need to wait for hidden - it should not exist at all)
+        await page.wait_for_selector(
+            f'[data-testid="instance-card-{instance_name}"]', state="detached", timeout=5000
+        )
         instance_card = await page.query_selector(f'[data-testid="instance-card-{instance_name}"]')
         assert (
             instance_card is None
@@ -656,42 +656,40 @@ async def test_mixed_squid_and_tls_tunnel(browser, unique_name, unique_port, api
         # Verify both cards are visible
         squid_card = page.locator(f'[data-testid="instance-card-{squid_name}"]')
         tunnel_card = page.locator(f'[data-testid="instance-card-{tunnel_name}"]')
-        await squid_card.wait_for(state="visible", timeout=10000)
-        await tunnel_card.wait_for(state="visible", timeout=10000)
+        await asyncio.gather(
+            squid_card.wait_for(state="visible", timeout=10000),
+            tunnel_card.wait_for(state="visible", timeout=10000),
+        )
+
+        # Independent reads on the two cards run concurrently
+        # Icon check covers both ha-icon custom element (HA mode) and span[data-icon] fallback
+        has_icon = """(el, icon) => {
+            const haIcons = el.querySelectorAll('ha-icon');
+            if (Array.from(haIcons).some(i => i.icon === icon)) return true;
+            const spans = el.querySelectorAll('span[data-icon]');
+            return Array.from(spans).some(s => s.getAttribute('data-icon') === icon);
+        }"""
+        squid_text, tunnel_text, has_server_icon, has_shield_icon = await asyncio.gather(
+            squid_card.inner_text(),
+            tunnel_card.inner_text(),
+            squid_card.evaluate(has_icon, "mdi:server-network"),
+            tunnel_card.evaluate(has_icon, "mdi:shield-lock-outline"),
+        )
 
         # Squid card should NOT have "TLS Tunnel" badge
-        squid_text = await squid_card.inner_text()
         assert (
             "TLS Tunnel" not in squid_text
         ), "Squid instance card should NOT show 'TLS Tunnel' badge"
 
         # TLS Tunnel card should have "TLS Tunnel" badge
-        tunnel_text = await tunnel_card.inner_text()
         assert (
             "TLS Tunnel" in tunnel_text
         ), "TLS Tunnel instance card should show 'TLS Tunnel' badge"
 
         # Verify Squid card uses server-network icon
-        # Check both ha-icon custom element (HA mode) and span[data-icon] fallback (standalone)
-        has_server_icon = await squid_card.evaluate(
-            """(el) => {
-                const haIcons = el.querySelectorAll('ha-icon');
-                if (Array.from(haIcons).some(i => i.icon === 'mdi:server-network')) return true;
-                const spans = el.querySelectorAll('span[data-icon]');
-                return Array.from(spans).some(s => s.getAttribute('data-icon') === 'mdi:server-network');
-            }"""
-        )
         assert has_server_icon, "Squid card should use server-network icon"
 
         # Verify TLS Tunnel card uses shield-lock-outline icon
-        has_shield_icon = await tunnel_card.evaluate(
-            """(el) => {
-                const haIcons = el.querySelectorAll('ha-icon');
-                if (Array.from(haIcons).some(i => i.icon === 'mdi:shield-lock-outline')) return true;
-                const spans = el.querySelectorAll('span[data-icon]');
-                return Array.from(spans).some(s => s.getAttribute('data-icon') === 'mdi:shield-lock-outline');
-            }"""
-        )
         assert has_shield_icon, "TLS Tunnel card should use shield-lock-outline icon"
 
         # Verify both exist via API with correct types
@@ -6,6 +6,7 @@ This module provides helper functions that wrap Playwright operations with
 
 from __future__ import annotations
 
+import asyncio
 import os
 from typing import Any, TypeVar
 
@@ -243,8 +244,6 @@ async def set_switch_state_by_testid(
     simulates a real user click and properly triggers React's event system.
     For <ha-switch> we set the property and dispatch a change event.
     """
-    import asyncio as _asyncio
-
     wrapper_selector = f'[data-testid="{testid}"]'
     await page.wait_for_selector(wrapper_selector, state="attached", timeout=timeout)
 
@@ -253,7 +252,7 @@ async def set_switch_state_by_testid(
     checkbox = page.locator(checkbox_selector)
     if await checkbox.count() > 0:
         await checkbox.set_checked(checked, timeout=timeout)
-        await _asyncio.sleep(0.2)
+        await asyncio.sleep(0.2)
         return
 
     # Fall back to ha-switch custom element
@@ -268,7 +267,7 @@ async def set_switch_state_by_testid(
         }""",
         checked,
     )
-    await _asyncio.sleep(0.2)
+    await asyncio.sleep(0.2)
 
 
 async def create_instance_via_ui(
@@ -296,9 +295,7 @@ async def create_instance_via_ui(
 
     if https_enabled:
         await set_switch_state_by_testid(page, "create-https-switch", True)
-        import asyncio as _asyncio
-
-        await _asyncio.sleep(0.3)
+        await asyncio.sleep(0.3)
 
     await page.click('[data-testid="create-submit-button"]')
 
@@ -328,8 +325,6 @@ async def create_tls_tunnel_via_ui(
         cover_domain: Cover domain for the cover website SSL cert (optional)
         timeout: Max wait time for instance card to appear
     """
-    import asyncio as _asyncio
-
     # Click either FAB (if instances exist) or empty state button (if dashboard is empty)
     try:
         await page.click('[data-testid="add-instance-button"]', timeout=2000)
@@ -339,7 +334,7 @@ async def create_tls_tunnel_via_ui(
 
     # Select TLS Tunnel proxy type
     await page.click('[data-testid="proxy-type-tls-tunnel"]')
-    await _asyncio.sleep(0.3)
+    await asyncio.sleep(0.3)
 
     await fill_textfield_by_testid(page, "create-name-input", name)
     await fill_textfield_by_testid(page, "create-port-input", str(port))
@@ -388,8 +383,6 @@ async def wait_for_instance_running(
 
     Default 60s to handle container degradation during full suite runs.
     """
-    import asyncio
-
     max_attempts = timeout // 2000
     for _ in range(max_attempts):
         try:
@@ -417,8 +410,6 @@ async def wait_for_instance_stopped(
 
     Default 60s to handle container degradation during full suite runs.
     """
-    import asyncio
-
     max_attempts = timeout // 2000
     for _ in range(max_attempts):
         try:
@@ -445,8 +436,6 @@ async def wait_for_addon_healthy(
     Useful after operations that may cause the addon container to restart
     (e.g., certificate regeneration under load).
     """
-    import asyncio
-
     max_attempts = timeout // 2000
     for _ in range(max_attempts):
         try:
@@ -468,8 +457,6 @@ async def get_icon_color(page: Page, instance_name: str) -> str:
     that changes background color based on running/stopped status.
     Reloads the dashboard first to ensure the UI reflects the latest backend state.
     """
-    import asyncio
-
     # Reload to pick up latest state from react-query
     await page.reload()
     await page.wait_for_selector(f'[data-testid="instance-card-{instance_name}"]', timeout=30000)
@@ -183,9 +183,9 @@ async def test_stop_instance(mock_manager_global):
     # Set the global manager to our mock
     main.manager = mock_manager_global
 
-    # Mock get_instances to return an instance so existence check passes
-    mock_manager_global.get_instances = AsyncMock(
-        return_value=[{"name": "test", "port": 3128, "running": True}]
+    # Mock get_instance to return an instance so existence check passes
+    mock_manager_global.get_instance = AsyncMock(
+        return_value={"name": "test", "port": 3128, "running": True}
     )
 
     # Create a mock request with proper match_info
@@ -212,8 +212,8 @@ async def test_remove_instance(mock_manager_global):
     # Set the global manager to our mock
     main.manager = mock_manager_global
 
-    # Mock get_instances to return the instance we want to delete
-    mock_manager_global.get_instances = AsyncMock(return_value=[{"name": "test", "port": 3128}])
+    # Mock get_instance to return the instance we want to delete
+    mock_manager_global.get_instance = AsyncMock(return_value={"name": "test", "port": 3128})
 
     # Create a mock request with proper match_info
     request = MagicMock()
@@ -256,6 +256,99 @@ async def test_get_certificate_info_valid(mock_manager_global, temp_dir, monkeyp
     assert data["pem"].startswith("-----BEGIN CERTIFICATE-----")
 
 
+@pytest.mark.asyncio
+async def test_get_certificate_info_cached_until_file_changes(
+    mock_manager_global, temp_dir, monkeypatch
+):
+    """Test certificate info is parsed once and reused while the file is unchanged."""
+    import importlib
+
+    import main
+
+    importlib.reload(main)
+
+    main.manager = mock_manager_global
+
+    certs_dir = temp_dir / "certs"
+    monkeypatch.setattr(proxy_manager, "CERTS_DIR", certs_dir)
+
+    cert_manager = CertificateManager(certs_dir, "test-instance")
+    await cert_manager.generate_certificate(common_name="first-cn")
+
+    request = MagicMock()
+    request.match_info = {"name": "test-instance"}
+
+    response = await main.get_instance_certificate_info(request)
+    assert json.loads(response.text)["common_name"] == "first-cn"
+
+    with patch(
+        "cryptography.x509.load_pem_x509_certificate", side_effect=AssertionError("re-parse")
+    ):
+        response = await main.get_instance_certificate_info(request)
+    assert json.loads(response.text)["common_name"] == "first-cn"
+
+    await cert_manager.generate_certificate(common_name="second-cn")
+    response = await main.get_instance_certificate_info(request)
+    assert json.loads(response.text)["common_name"] == "second-cn"
+
+
+@pytest.mark.asyncio
+async def test_get_instance_logs_returns_tail(mock_manager_global, temp_dir, monkeypatch):
+    """Test GET /api/instances/{name}/logs returns only the last 100 lines."""
+    import importlib
+
+    import main
+
+    importlib.reload(main)
+
+    main.manager = mock_manager_global
+
+    logs_dir = temp_dir / "logs"
+    monkeypatch.setattr(proxy_manager, "LOGS_DIR", logs_dir)
+    monkeypatch.setattr(main, "LOG_TAIL_CHUNK_SIZE", 64)
+
+    log_dir = logs_dir / "test-instance"
+    log_dir.mkdir(parents=True)
+    (log_dir / "access.log").write_text("".join(f"line{i}\n" for i in range(1000)))
+
+    request = MagicMock()
+    request.match_info = {"name": "test-instance"}
+    request.query = {"type": "access"}
+
+    response = await main.get_instance_logs(request)
+
+    assert response.status == 200
+    assert response.text == "".join(f"line{i}\n" for i in range(900, 1000))
+
+
+@pytest.mark.asyncio
+async def test_get_instance_logs_replaces_invalid_utf8(mock_manager_global, temp_dir, monkeypatch):
+    """Test GET /api/instances/{name}/logs replaces undecodable bytes instead of failing."""
+    import importlib
+
+    import main
+
+    importlib.reload(main)
+
+    main.manager = mock_manager_global
+
+    logs_dir = temp_dir / "logs"
+    monkeypatch.setattr(proxy_manager, "LOGS_DIR", logs_dir)
+
+    log_dir = logs_dir / "test-instance"
+    log_dir.mkdir(parents=True)
+    (log_dir / "access.log").write_bytes(b"ok\nbad \xff\xfe line\n")
+
+    request = MagicMock()
+    request.match_info = {"name": "test-instance"}
+    request.query = {"type": "access"}
+
+    response = await main.get_instance_logs(request)
+
+    assert response.status == 200
+    assert response.text == "ok\nbad \ufffd\ufffd line\n"
+
+
 @pytest.mark.asyncio
 async def test_clear_instance_logs(mock_manager_global, temp_dir, monkeypatch):
     """Test POST /api/instances/{name}/logs/clear clears log file."""
@@ -283,3 +376,242 @@ async def test_clear_instance_logs(mock_manager_global, temp_dir, monkeypatch):
 
     assert response.status == 200
     assert log_file.read_text() == ""
+
+
+@pytest.mark.asyncio
+async def test_probe_tcp_reports_reachability(mock_manager_global):
+    """Test _probe_tcp succeeds on a listening port and reports refused connections."""
+    import asyncio
+    import importlib
+
+    import main
+
+    importlib.reload(main)
+
+    server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        assert await main._probe_tcp("127.0.0.1", port, timeout=2) is None
+    await server.wait_closed()
+
+    error = await main._probe_tcp("127.0.0.1", port, timeout=2)
+    assert error is not None
+    assert error.startswith("Connection failed")
+
+
+@pytest.mark.asyncio
+async def test_add_instance_users_batch(mock_manager_global):
+    """Test POST /api/instances/{name}/users with a users list uses the batch path."""
+    import importlib
+
+    import main
+
+    importlib.reload(main)
+
+    main.manager = mock_manager_global
+    mock_manager_global._get_proxy_type = MagicMock(return_value="squid")
+    mock_manager_global.add_users = AsyncMock(return_value=["alice", "bob"])
+    users = [
+        {"username": "alice", "password": "password1"},
+        {"username": "bob", "password": "password2"},
+    ]
+
+    async def mock_json():
+        return {"users": users}
+
+    request = MagicMock()
+    request.match_info = {"name": "test"}
+    request.json = mock_json
+
+    response = await main.add_instance_user(request)
+
+    assert response.status == 200
+    assert json.loads(response.text) == {
+        "status": "users_added",
+        "added": ["alice", "bob"],
+        "skipped": [],
+    }
+    mock_manager_global.add_users.assert_awaited_once_with("test", users)
+    mock_manager_global.add_user.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_add_instance_user_rejects_invalid_credentials_early(mock_manager_global):
+    """Test invalid credentials are rejected before instance lookup or manager calls."""
+    import importlib
+
+    import main
+
+    importlib.reload(main)
+
+    main.manager = mock_manager_global
+    mock_manager_global._get_proxy_type = MagicMock(return_value="squid")
+    mock_manager_global.add_user = AsyncMock(return_value=True)
+
+    async def mock_json():
+        return {"username": "bad user", "password": "password1"}
+
+    request = MagicMock()
+    request.match_info = {"name": "test"}
+    request.json = mock_json
+
+    response = await main.add_instance_user(request)
+
+    assert response.status == 400
+    assert "Username" in json.loads(response.text)["error"]
+    mock_manager_global._get_proxy_type.assert_not_called()
+    mock_manager_global.add_user.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_add_instance_users_batch_rejects_non_string_fields(mock_manager_global):
+    """Test batch entries with non-string username/password get a 400, not a 500."""
+    import importlib
+
+    import main
+
+    importlib.reload(main)
+
+    main.manager = mock_manager_global
+    mock_manager_global._get_proxy_type = MagicMock(return_value="squid")
+    mock_manager_global.add_users = AsyncMock(return_value=[])
+
+    async def mock_json():
+        return {"users": [{"username": 123, "password": "password1"}]}
+
+    request = MagicMock()
+    request.match_info = {"name": "test"}
+    request.json = mock_json
+
+    response = await main.add_instance_user(request)
+
+    assert response.status == 400
+    mock_manager_global.add_users.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_add_instance_users_batch_rejects_invalid_credentials(mock_manager_global):
+    """Test a batch with invalid credentials is rejected whole, naming the bad entries."""
+    import importlib
+
+    import main
+
+    importlib.reload(main)
+
+    main.manager = mock_manager_global
+    mock_manager_global._get_proxy_type = MagicMock(return_value="squid")
+    mock_manager_global.add_users = AsyncMock(return_value=[])
+
+    async def mock_json():
+        return {
+            "users": [
+                {"username": "alice", "password": "password1"},
+                {"username": "bad user", "password": "password1"},
+                {"username": "bob", "password": "short"},
+            ]
+        }
+
+    request = MagicMock()
+    request.match_info = {"name": "test"}
+    request.json = mock_json
+
+    response = await main.add_instance_user(request)
+
+    assert response.status == 400
+    data = json.loads(response.text)
+    assert [entry["username"] for entry in data["invalid"]] == ["bad user", "bob"]
+    mock_manager_global._get_proxy_type.assert_not_called()
+    mock_manager_global.add_users.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_add_instance_users_batch_reports_skipped(mock_manager_global):
+    """Test batch users that already exist are reported as skipped."""
+    import importlib
+
+    import main
+
+    importlib.reload(main)
+
+    main.manager = mock_manager_global
+    mock_manager_global._get_proxy_type = MagicMock(return_value="squid")
+    mock_manager_global.add_users = AsyncMock(return_value=["bob"])
+
+    async def mock_json():
+        return {
+            "users": [
+                {"username": "alice", "password": "password1"},
+                {"username": "bob", "password": "password2"},
+            ]
+        }
+
+    request = MagicMock()
+    request.match_info = {"name": "test"}
+    request.json = mock_json
+
+    response = await main.add_instance_user(request)
+
+    assert response.status == 200
+    assert json.loads(response.text)["skipped"] == ["alice"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("usernames", "removed"),
+    [(["alice", "bob"], ["alice", "bob"]), (["ghost"], [])],
+)
+async def test_remove_instance_users(mock_manager_global, usernames, removed):
+    """Test DELETE /api/instances/{name}/users removes known users and skips unknown ones."""
+    import importlib
+
+    import main
+
+    importlib.reload(main)
+
+    main.manager = mock_manager_global
+    mock_manager_global._get_proxy_type = MagicMock(return_value="squid")
+    mock_manager_global.remove_users = AsyncMock(return_value=removed)
+
+    async def mock_json():
+        return {"usernames": usernames}
+
+    request = MagicMock()
+    request.match_info = {"name": "test"}
+    request.json = mock_json
+
+    response = await main.remove_instance_users(request)
+
+    assert response.status == 200
+    assert json.loads(response.text) == {"status": "users_removed", "removed": removed}
+    mock_manager_global.remove_users.assert_awaited_once_with("test", usernames)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "body",
+    [{}, {"usernames": []}, {"usernames": "alice"}, {"usernames": [123]}, {"usernames": ["a b"]}],
+)
+async def test_remove_instance_users_rejects_bad_body(mock_manager_global, body):
+    """Test DELETE /api/instances/{name}/users rejects malformed bodies before any lookup."""
+    import importlib
+
+    import main
+
+    importlib.reload(main)
+
+    main.manager = mock_manager_global
+    mock_manager_global._get_proxy_type = MagicMock(return_value="squid")
+    mock_manager_global.remove_users = AsyncMock(return_value=[])
+
+    async def mock_json():
+        return body
+
+    request = MagicMock()
+    request.match_info = {"name": "test"}
+    request.json = mock_json
+
+    response = await main.remove_instance_users(request)
+
+    assert response.status == 400
+    mock_manager_global._get_proxy_type.assert_not_called()
+    mock_manager_global.remove_users.assert_not_called()
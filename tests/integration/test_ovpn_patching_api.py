@@ -50,6 +50,12 @@ def mock_manager():
             },
         ]
     )
+    # Single-instance lookup mirrors whatever get_instances is configured to return
+    manager.get_instance = AsyncMock(
+        side_effect=lambda name: next(
+            (i for i in manager.get_instances.return_value if i["name"] == name), None
+        )
+    )
     manager.update_instance = AsyncMock(return_value=True)
     return manager
 
@@ -3,6 +3,7 @@
 # Add parent directory to path for imports
 import sys
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -10,7 +11,7 @@ sys.path.insert(
     0, str(Path(__file__).parent.parent.parent / "squid_proxy_manager" / "rootfs" / "app")
 )
 
-from auth_manager import AuthManager
+from auth_manager import AuthManager, apr1_hash
 
 
 def test_auth_manager_init(temp_dir):
@@ -137,3 +138,125 @@ def test_load_existing_users(temp_dir):
     auth_manager = AuthManager(passwd_file)
     users = auth_manager.get_users()
     assert "user1" in users
+
+
+def test_apr1_hash_matches_openssl():
+    """Test apr1 hashing matches `openssl passwd -apr1` output."""
+    assert apr1_hash("password123", "abcdefgh") == "$apr1$abcdefgh$NpGqt/j3qiYVyTo0Gid3P1"
+    assert (
+        apr1_hash("pässwörd with spaces and a long tail 1234567890", "Zx9.ab/")
+        == "$apr1$Zx9.ab/$SzCNqH4kJKvAmeFMZ13sR0"
+    )
+
+
+def test_add_users_batch(temp_dir):
+    """Test adding several users skips invalid and duplicate entries."""
+    passwd_file = temp_dir / "passwd"
+    auth_manager = AuthManager(passwd_file)
+    auth_manager.add_user("existing", "password123")
+
+    added = auth_manager.add_users(
+        [
+            {"username": "user1", "password": "password123"},
+            {"username": "bad user", "password": "password123"},
+            {"username": "user2", "password": "short"},
+            {"username": "existing", "password": "password123"},
+            {"username": 123, "password": "password123"},  # type: ignore[dict-item]
+            {"username": "user3", "password": "password456"},
+        ]
+    )
+
+    assert added == ["user1", "user3"]
+    assert auth_manager.get_users() == ["existing", "user1", "user3"]
+    assert oct(passwd_file.stat().st_mode)[-3:] == "640"
+    assert not passwd_file.with_name("passwd.tmp").exists()
+
+
+def test_remove_users_batch(temp_dir):
+    """Test removing several users rewrites the file once and skips unknown names."""
+    passwd_file = temp_dir / "passwd"
+    auth_manager = AuthManager(passwd_file)
+    auth_manager.add_users(
+        [
+            {"username": "user1", "password": "password123"},
+            {"username": "user2", "password": "password123"},
+            {"username": "user3", "password": "password123"},
+        ]
+    )
+
+    with patch.object(
+        AuthManager, "_save_users", autospec=True, side_effect=AuthManager._save_users
+    ) as mock_save:
+        removed = auth_manager.remove_users(["user1", "missing", "user3"])
+
+    assert removed == ["user1", "user3"]
+    mock_save.assert_called_once()
+    assert AuthManager(passwd_file).get_users() == ["user2"]
+    assert auth_manager.remove_users(["missing"]) == []
+
+
+def test_get_users_cached_until_file_changes(temp_dir):
+    """Test get_users reuses the parsed users until the passwd file changes."""
+    passwd_file = temp_dir / "passwd"
+    auth_manager = AuthManager(passwd_file)
+    auth_manager.add_user("user1", "password123")
+    assert auth_manager.get_users() == ["user1"]
+
+    with patch("pathlib.Path.open", side_effect=AssertionError("re-parse")):
+        assert auth_manager.get_users() == ["user1"]
+        assert auth_manager.get_user_count() == 1
+
+    # A write from another manager changes the file, so the cache is refreshed
+    AuthManager(passwd_file).add_user("user2", "password123")
+    assert auth_manager.get_users() == ["user1", "user2"]
+
+
+def test_own_writes_keep_cache_primed(temp_dir):
+    """Test add/remove update the cached users instead of forcing a re-read."""
+    passwd_file = temp_dir / "passwd"
+    auth_manager = AuthManager(passwd_file)
+    auth_manager.add_users(
+        [
+            {"username": "user1", "password": "password123"},
+            {"username": "user2", "password": "password123"},
+        ]
+    )
+
+    with patch("pathlib.Path.open", side_effect=AssertionError("re-parse")):
+        assert auth_manager.add_user("user3", "password123") is True
+        assert auth_manager.get_users() == ["user1", "user2", "user3"]
+        assert auth_manager.remove_user("user1") is True
+        assert auth_manager.get_users() == ["user2", "user3"]
+
+    passwd_file.write_text("other:$apr1$abcdefgh$NpGqt/j3qiYVyTo0Gid3P1\n")
+    assert auth_manager.get_users() == ["other"]
+
+
+def test_add_user_appends_entry(temp_dir):
+    """Test adding a user appends a line and keeps existing entries intact."""
+    passwd_file = temp_dir / "passwd"
+    passwd_file.write_text("existing:$apr1$abcdefgh$NpGqt/j3qiYVyTo0Gid3P1")
+    auth_manager = AuthManager(passwd_file)
+
+    assert auth_manager.add_user("newuser", "password123") is True
+
+    lines = passwd_file.read_text().splitlines()
+    assert lines[0] == "existing:$apr1$abcdefgh$NpGqt/j3qiYVyTo0Gid3P1"
+    assert lines[1].startswith("newuser:$apr1$")
+    assert passwd_file.read_text().endswith("\n")
+    assert auth_manager.get_users() == ["existing", "newuser"]
+
+
+def test_concurrent_add_user_keeps_all_entries(temp_dir):
+    """Test concurrent add_user calls on one passwd file do not lose entries."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    passwd_file = temp_dir / "passwd"
+
+    def add(i):
+        return AuthManager(passwd_file).add_user(f"user{i}", "password123")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(add, range(16)))
+
+    assert AuthManager(passwd_file).get_user_count() == 16
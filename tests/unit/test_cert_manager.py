@@ -2,6 +2,7 @@
 
 # Add parent directory to path for imports
 import sys
+from datetime import timedelta
 from pathlib import Path
 
 import pytest
@@ -27,6 +28,19 @@ async def test_cert_manager_init(temp_dir):
     assert cert_manager.key_file == cert_manager.cert_dir / "squid.key"
 
 
+@pytest.mark.asyncio
+async def test_cert_manager_custom_cert_name(temp_dir):
+    """Test CertificateManager writes a custom-named certificate pair."""
+    cert_manager = CertificateManager(temp_dir, "certs", cert_name="cover")
+
+    cert_file, key_file = await cert_manager.generate_certificate()
+
+    assert cert_file == temp_dir / "certs" / "cover.crt"
+    assert key_file == temp_dir / "certs" / "cover.key"
+    assert cert_file.exists()
+    assert key_file.exists()
+
+
 @pytest.mark.asyncio
 async def test_generate_certificate(temp_dir):
     """Test certificate generation."""
@@ -94,6 +108,9 @@ async def test_generate_certificate_custom_validity(temp_dir):
     assert b"BEGIN CERTIFICATE" in cert_content
     assert b"END CERTIFICATE" in cert_content
 
+    cert = x509.load_pem_x509_certificate(cert_content)
+    assert cert.not_valid_after_utc - cert.not_valid_before_utc == timedelta(days=730)
+
 
 @pytest.mark.asyncio
 async def test_generate_certificate_custom_key_size(temp_dir):
@@ -163,3 +180,23 @@ async def test_generate_certificate_with_parameters(temp_dir):
     # Check Organization
     org = cert.subject.get_attributes_for_oid(x509.NameOID.ORGANIZATION_NAME)[0].value
     assert org == "Test Org"
+
+
+@pytest.mark.asyncio
+async def test_generate_certificate_ecdsa(temp_dir):
+    """Test ECDSA P-256 certificate generation."""
+    from cryptography.hazmat.primitives.asymmetric import ec
+
+    cert_manager = CertificateManager(temp_dir / "certs", "test-instance")
+
+    cert_file, key_file = await cert_manager.generate_certificate(key_type="ecdsa")
+
+    cert = x509.load_pem_x509_certificate(cert_file.read_bytes())
+    public_key = cert.public_key()
+    assert isinstance(public_key, ec.EllipticCurvePublicKey)
+    assert public_key.curve.name == "secp256r1"
+    assert cert.extensions.get_extension_for_class(x509.KeyUsage).value.key_encipherment is False
+    assert b"BEGIN PRIVATE KEY" in key_file.read_bytes()  # pragma: allowlist secret
+
+    with pytest.raises(ValueError, match="key_type"):
+        await cert_manager.generate_certificate(key_type="dsa")
@@ -109,6 +109,10 @@ async def test_get_instances(mock_popen, temp_data_dir):
         assert instances[0]["name"] == "instance1"
         assert instances[0]["running"] is True
 
+        instance = await manager.get_instance("instance1")
+        assert instance == instances[0]
+        assert await manager.get_instance("missing") is None
+
 
 @pytest.mark.asyncio
 async def test_start_instance(mock_popen, temp_data_dir):
@@ -185,3 +189,312 @@ async def test_remove_instance(temp_data_dir):
 
         assert result is True
         assert not instance_dir.exists()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", ["certs", "logs"])
+async def test_create_instance_rejects_reserved_names(mock_popen, temp_data_dir, name):
+    """Test names of the shared certs/logs directories cannot become instances."""
+    with (
+        patch("proxy_manager.DATA_DIR", temp_data_dir),
+        patch("proxy_manager.CONFIG_DIR", temp_data_dir / "squid_proxy_manager"),
+        patch("proxy_manager.CERTS_DIR", temp_data_dir / "squid_proxy_manager" / "certs"),
+        patch("proxy_manager.LOGS_DIR", temp_data_dir / "squid_proxy_manager" / "logs"),
+    ):
+        from proxy_manager import ProxyInstanceManager
+
+        manager = ProxyInstanceManager()
+
+        with pytest.raises(ValueError, match="reserved"):
+            await manager.create_instance(name=name, port=3128)
+        mock_popen.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_read_metadata_cache_invalidated_on_change(temp_data_dir):
+    """Test instance.json metadata is cached until the file changes."""
+    with (
+        patch("proxy_manager.DATA_DIR", temp_data_dir),
+        patch("proxy_manager.CONFIG_DIR", temp_data_dir / "squid_proxy_manager"),
+        patch("proxy_manager.CERTS_DIR", temp_data_dir / "squid_proxy_manager" / "certs"),
+        patch("proxy_manager.LOGS_DIR", temp_data_dir / "squid_proxy_manager" / "logs"),
+    ):
+        from proxy_manager import ProxyInstanceManager
+
+        manager = ProxyInstanceManager()
+        instance_dir = temp_data_dir / "squid_proxy_manager" / "meta-test"
+        instance_dir.mkdir(parents=True)
+        metadata_file = instance_dir / "instance.json"
+        metadata_file.write_text('{"proxy_type": "squid", "port": 3128}')
+
+        assert (manager._read_metadata(metadata_file) or {})["port"] == 3128
+        with patch("pathlib.Path.read_text", side_effect=AssertionError("re-read")):
+            assert (manager._read_metadata(metadata_file) or {})["port"] == 3128
+
+        metadata_file.write_text('{"proxy_type": "tls_tunnel", "port": 34567}')
+        assert manager._get_proxy_type("meta-test") == "tls_tunnel"
+
+        metadata_file.unlink()
+        assert manager._read_metadata(metadata_file) is None
+
+
+@pytest.mark.asyncio
+async def test_start_instance_skips_initialized_cache(mock_popen, temp_data_dir):
+    """Test squid -z is not re-run when the cache directory is already initialized."""
+    with (
+        patch("proxy_manager.DATA_DIR", temp_data_dir),
+        patch("proxy_manager.CONFIG_DIR", temp_data_dir / "squid_proxy_manager"),
+        patch("proxy_manager.CERTS_DIR", temp_data_dir / "squid_proxy_manager" / "certs"),
+        patch("proxy_manager.LOGS_DIR", temp_data_dir / "squid_proxy_manager" / "logs"),
+        patch("os.path.exists", return_value=True),
+        patch("subprocess.run") as mock_run,
+    ):
+        from proxy_manager import ProxyInstanceManager
+
+        manager = ProxyInstanceManager()
+
+        instance_dir = temp_data_dir / "squid_proxy_manager" / "test-instance"
+        instance_dir.mkdir(parents=True)
+        (instance_dir / "squid.conf").touch()
+        cache_dir = temp_data_dir / "squid_proxy_manager" / "logs" / "test-instance" / "cache"
+        (cache_dir / "00").mkdir(parents=True)
+
+        result = await manager.start_instance("test-instance")
+
+        assert result is True
+        mock_run.assert_not_called()
+
+
+def test_verify_cert_pair(temp_dir):
+    """Test generated cert/key pair verification errors."""
+    from proxy_manager import _verify_cert_pair
+
+    cert_file = temp_dir / "squid.crt"
+    key_file = temp_dir / "squid.key"
+
+    with pytest.raises(RuntimeError, match="Failed to generate"):
+        _verify_cert_pair("test", cert_file, key_file)
+
+    cert_file.touch()
+    key_file.touch()
+    with pytest.raises(RuntimeError, match="are empty"):
+        _verify_cert_pair("test", cert_file, key_file)
+
+    cert_file.write_text("not a certificate")
+    key_file.write_text("not a key")
+    with pytest.raises(RuntimeError, match="is invalid"):
+        _verify_cert_pair("test", cert_file, key_file)
+
+
+@pytest.mark.asyncio
+async def test_stop_instance_kills_after_timeout(temp_data_dir):
+    """Test stop_instance escalates to SIGKILL when the process ignores SIGTERM."""
+    import signal
+    import subprocess
+
+    with (
+        patch("proxy_manager.DATA_DIR", temp_data_dir),
+        patch("proxy_manager.CONFIG_DIR", temp_data_dir / "squid_proxy_manager"),
+        patch("proxy_manager.CERTS_DIR", temp_data_dir / "squid_proxy_manager" / "certs"),
+        patch("proxy_manager.LOGS_DIR", temp_data_dir / "squid_proxy_manager" / "logs"),
+        patch("os.killpg") as mock_killpg,
+        patch("os.getpgid", return_value=123),
+    ):
+        from proxy_manager import ProxyInstanceManager
+
+        manager = ProxyInstanceManager()
+
+        mock_process = MagicMock()
+        mock_process.pid = 12345
+        mock_process.poll.return_value = None
+        mock_process.wait.side_effect = [subprocess.TimeoutExpired("squid", 5), 0]
+        manager.processes["test-instance"] = mock_process
+
+        result = await manager.stop_instance("test-instance")
+
+        assert result is True
+        assert "test-instance" not in manager.processes
+        mock_killpg.assert_any_call(123, signal.SIGTERM)
+        mock_killpg.assert_any_call(123, signal.SIGKILL)
+        assert mock_process.wait.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_save_desired_state_skips_unchanged(temp_data_dir):
+    """Test desired_state is only rewritten when it actually changes."""
+    with (
+        patch("proxy_manager.DATA_DIR", temp_data_dir),
+        patch("proxy_manager.CONFIG_DIR", temp_data_dir / "squid_proxy_manager"),
+        patch("proxy_manager.CERTS_DIR", temp_data_dir / "squid_proxy_manager" / "certs"),
+        patch("proxy_manager.LOGS_DIR", temp_data_dir / "squid_proxy_manager" / "logs"),
+    ):
+        from proxy_manager import ProxyInstanceManager
+
+        manager = ProxyInstanceManager()
+        instance_dir = temp_data_dir / "squid_proxy_manager" / "state-test"
+        instance_dir.mkdir(parents=True)
+        metadata_file = instance_dir / "instance.json"
+        metadata_file.write_text('{"proxy_type": "squid", "port": 3128}')
+
+        manager._save_desired_state("state-test", "running")
+        assert (manager._read_metadata(metadata_file) or {})["desired_state"] == "running"
+
+        with patch("pathlib.Path.write_text") as mock_write:
+            manager._save_desired_state("state-test", "running")
+        mock_write.assert_not_called()
+
+        manager._save_desired_state("state-test", "stopped")
+        assert (manager._read_metadata(metadata_file) or {})["desired_state"] == "stopped"
+
+
+@pytest.mark.asyncio
+async def test_save_desired_state_within_one_mtime_tick(temp_data_dir):
+    """Test a stop then start landing on the same mtime still persists the final state."""
+    import json
+    import os
+
+    with (
+        patch("proxy_manager.DATA_DIR", temp_data_dir),
+        patch("proxy_manager.CONFIG_DIR", temp_data_dir / "squid_proxy_manager"),
+        patch("proxy_manager.CERTS_DIR", temp_data_dir / "squid_proxy_manager" / "certs"),
+        patch("proxy_manager.LOGS_DIR", temp_data_dir / "squid_proxy_manager" / "logs"),
+    ):
+        from proxy_manager import ProxyInstanceManager
+
+        manager = ProxyInstanceManager()
+        instance_dir = temp_data_dir / "squid_proxy_manager" / "tick-test"
+        instance_dir.mkdir(parents=True)
+        metadata_file = instance_dir / "instance.json"
+        metadata_file.write_text('{"proxy_type": "squid", "port": 3128}')
+
+        manager._save_desired_state("tick-test", "running")
+        tick = metadata_file.stat().st_mtime_ns
+
+        # "running" and "stopped" have the same length; pin mtime so the
+        # (mtime_ns, size) cache key cannot tell the rewrites apart
+        manager._save_desired_state("tick-test", "stopped")
+        os.utime(metadata_file, ns=(tick, tick))
+        manager._save_desired_state("tick-test", "running")
+        os.utime(metadata_file, ns=(tick, tick))
+
+        assert json.loads(metadata_file.read_text())["desired_state"] == "running"
+        assert (manager._read_metadata(metadata_file) or {})["desired_state"] == "running"
+
+
+@pytest.mark.asyncio
+async def test_restore_desired_states_runs_instances_concurrently(temp_data_dir):
+    """Test restore starts instances in parallel and one failure does not block others."""
+    import asyncio
+
+    with (
+        patch("proxy_manager.DATA_DIR", temp_data_dir),
+        patch("proxy_manager.CONFIG_DIR", temp_data_dir / "squid_proxy_manager"),
+        patch("proxy_manager.CERTS_DIR", temp_data_dir / "squid_proxy_manager" / "certs"),
+        patch("proxy_manager.LOGS_DIR", temp_data_dir / "squid_proxy_manager" / "logs"),
+    ):
+        from proxy_manager import ProxyInstanceManager
+
+        manager = ProxyInstanceManager()
+        for name, desired in (("alpha", "running"), ("beta", "running"), ("gamma", "stopped")):
+            instance_dir = temp_data_dir / "squid_proxy_manager" / name
+            instance_dir.mkdir(parents=True)
+            (instance_dir / "instance.json").write_text(f'{{"desired_state": "{desired}"}}')
+            (instance_dir / "squid.conf").write_text("")
+
+        in_flight = 0
+        peak = 0
+
+        async def fake_start(name):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if name == "alpha":
+                raise RuntimeError("boom")
+            return True
+
+        with patch.object(manager, "start_instance", side_effect=fake_start) as mock_start:
+            await manager.restore_desired_states()
+
+        assert sorted(call.args[0] for call in mock_start.call_args_list) == ["alpha", "beta"]
+        assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_add_and_remove_users_batch_restart_once(temp_data_dir):
+    """Test batch user changes rewrite passwd once and restart a running instance once."""
+    from unittest.mock import AsyncMock
+
+    with (
+        patch("proxy_manager.DATA_DIR", temp_data_dir),
+        patch("proxy_manager.CONFIG_DIR", temp_data_dir / "squid_proxy_manager"),
+        patch("proxy_manager.CERTS_DIR", temp_data_dir / "squid_proxy_manager" / "certs"),
+        patch("proxy_manager.LOGS_DIR", temp_data_dir / "squid_proxy_manager" / "logs"),
+        patch("proxy_manager.asyncio.sleep", new=AsyncMock()),
+    ):
+        from proxy_manager import ProxyInstanceManager
+
+        manager = ProxyInstanceManager()
+        (temp_data_dir / "squid_proxy_manager" / "batch").mkdir(parents=True)
+        manager.processes["batch"] = MagicMock()
+
+        with (
+            patch.object(manager, "stop_instance", new=AsyncMock(return_value=True)) as stop,
+            patch.object(manager, "start_instance", new=AsyncMock(return_value=True)) as start,
+        ):
+            added = await manager.add_users(
+                "batch",
+                [
+                    {"username": "alice", "password": "password1"},
+                    {"username": "bob", "password": "password2"},
+                    {"username": "alice", "password": "password3"},
+                ],
+            )
+            assert added == ["alice", "bob"]
+            assert stop.await_count == 1
+            assert start.await_count == 1
+
+            removed = await manager.remove_users("batch", ["alice", "bob", "carol"])
+            assert removed == ["alice", "bob"]
+            assert stop.await_count == 2
+            assert start.await_count == 2
+
+            assert await manager.remove_users("batch", ["alice"]) == []
+            assert stop.await_count == 2
+
+        assert await manager.get_users("batch") == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_user_changes_share_one_restart(temp_data_dir):
+    """Test user changes arriving before a restart begins coalesce into it."""
+    import asyncio
+    from unittest.mock import AsyncMock
+
+    with (
+        patch("proxy_manager.DATA_DIR", temp_data_dir),
+        patch("proxy_manager.CONFIG_DIR", temp_data_dir / "squid_proxy_manager"),
+        patch("proxy_manager.CERTS_DIR", temp_data_dir / "squid_proxy_manager" / "certs"),
+        patch("proxy_manager.LOGS_DIR", temp_data_dir / "squid_proxy_manager" / "logs"),
+        patch("proxy_manager.asyncio.sleep", new=AsyncMock()),
+    ):
+        from proxy_manager import ProxyInstanceManager
+
+        manager = ProxyInstanceManager()
+        manager.processes["coalesce"] = MagicMock()
+
+        with (
+            patch.object(manager, "stop_instance", new=AsyncMock(return_value=True)) as stop,
+            patch.object(manager, "start_instance", new=AsyncMock(return_value=True)) as start,
+        ):
+            results = await asyncio.gather(
+                *(manager._restart_for_user_change("coalesce") for _ in range(3))
+            )
+            assert results == [True, True, True]
+            assert stop.await_count == 1
+            assert start.await_count == 1
+
+            # A change after the restart has begun needs a restart of its own
+            assert await manager._restart_for_user_change("coalesce") is True
+            assert stop.await_count == 2
@@ -103,3 +103,17 @@ def test_generate_config_custom_data_dir():
         assert f"{custom_data_dir}/my-proxy/passwd" in content
         assert f"{custom_data_dir}/logs/my-proxy/access.log" in content
         assert f"{custom_data_dir}/logs/my-proxy/cache.log" in content
+
+
+def test_generate_config_skips_unchanged_write():
+    """Test regenerating identical config does not rewrite the file."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config_file = Path(tmpdir) / "squid.conf"
+        gen = SquidConfigGenerator("test-instance", 3128, False, tmpdir)
+
+        assert gen.generate_config(config_file) is True
+        assert gen.generate_config(config_file) is False
+
+        gen.port = 3129
+        assert gen.generate_config(config_file) is True
+        assert "http_port 3129" in config_file.read_text()